@@ -1,7 +1,7 @@
 from .security import access_token_scheme, refresh_token_scheme
 from .base import (
     get_access_token_payload,
-    CurrentUserDepends, RoleChecker,
+    CurrentUserDepends, RoleChecker, TokenRoleChecker,
     CurrentRootUser, CurrentSimpleUser, CurrentAdminUser,
 )
-from .factories import DBSessionDepends, get_user_service
\ No newline at end of file
+from .factories import DBSessionDepends, get_session, get_user_service
\ No newline at end of file
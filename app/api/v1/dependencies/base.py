@@ -3,14 +3,17 @@ from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 
+from app.core.config import get_settings
 from app.core.enums import UserRole
 from app.exceptions.auth import UserIsNotActivated
 from app.schemas.user import UserModel
 from app.service.user import UserService
 from app.exceptions.common import NotFoundError
+from app.utils.security import token_cache
 from .factories import get_user_service
 from .security import access_token_scheme
 
+settings = get_settings()
 
 async def get_access_token_payload(
     token_payload: dict = Depends(access_token_scheme),
@@ -28,7 +31,10 @@ async def get_current_user(
         user_service: UserService = Depends(get_user_service),
         token_payload: dict = Depends(get_access_token_payload)) -> UserModel:
     try:
-        user = await user_service.get_user_by_id(token_payload["id"])
+        if token_cache.trusted:
+            user = await user_service.get_cached_user(token_payload["id"])
+        else:
+            user = await user_service.get_user_by_id(token_payload["id"])
         if not user.is_active:
             raise UserIsNotActivated(user.username)
     except NotFoundError as e:
@@ -47,6 +53,28 @@ class RoleChecker:
         return user
 
 
+class TokenRoleChecker:
+    """
+    Role check for routes that do not need the user itself. With ``AUTH_TRUST_ROLE_CLAIM`` enabled the role claim
+    of the access token is trusted and the user is not loaded at all, so only token revocation, not the ``is_active``
+    flag, cuts off a user before the token expires. The user is loaded anyway while revocations cannot be stored.
+    """
+    def __init__(self, *allowed_roles):
+        self.allowed_roles = [role.value for role in allowed_roles]
+
+    async def __call__(
+            self,
+            user_service: UserService = Depends(get_user_service),
+            token_payload: dict = Depends(get_access_token_payload),
+    ) -> None:
+        if settings.AUTH_TRUST_ROLE_CLAIM and token_cache.trusted:
+            role = token_payload.get("role")
+        else:
+            role = (await get_current_user(user_service, token_payload)).role.value
+        if role not in self.allowed_roles:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+
+
 get_current_simple_user = RoleChecker(UserRole.USER)
 get_current_admin_user  = RoleChecker(UserRole.ADMIN, UserRole.ROOT)
 get_current_root_user   = RoleChecker(UserRole.ROOT)
@@ -1,15 +1,51 @@
+import time
 from typing import Annotated
 
-from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.core.database import async_session
+from app.core.config import get_settings
+from app.core.database import async_session, replica_session, replica_engine, unit_of_work
 from app.repositories.orm import UserRepository
 from app.service.user import UserService
 
+settings = get_settings()
 
-async def get_session():
-    async with async_session() as session:
+READ_ONLY_METHODS = frozenset({"GET", "HEAD"})
+
+# set on write responses: until it expires, reads of the same client go to the primary, so they see their own
+# changes despite replication lag, whichever worker serves them
+STICKY_COOKIE = "db_primary_until"
+
+
+def _sticky_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def route_session(request: Request) -> async_sessionmaker:
+    """
+    Session factory for the request: reads go to the replica unless the client wrote within
+    ``DATABASE_REPLICA_STICKY_SECONDS``, as told by its ``STICKY_COOKIE``.
+    """
+    if replica_engine is None or request.method not in READ_ONLY_METHODS or _sticky_to_primary(request):
+        return async_session
+    return replica_session
+
+
+async def get_session(request: Request, response: Response):
+    factory = route_session(request)
+    if replica_engine is not None and request.method not in READ_ONLY_METHODS:
+        response.set_cookie(
+            STICKY_COOKIE,
+            str(time.time() + settings.DATABASE_REPLICA_STICKY_SECONDS),
+            max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+            httponly=True,
+            samesite="lax",
+        )
+    async with unit_of_work(factory) as session:
         yield session
 
 
@@ -17,4 +53,4 @@ DBSessionDepends = Annotated[AsyncSession, Depends(get_session)]
 
 
 async def get_user_service(db: DBSessionDepends):
-    return UserService(UserRepository(db))
\ No newline at end of file
+    return UserService(UserRepository(db))
@@ -3,7 +3,7 @@ from fastapi.security import OAuth2PasswordBearer, HTTPBearer
 from jose import JWTError, ExpiredSignatureError
 
 from app.core.enums import TokenType
-from app.utils.security import decode_token
+from app.utils.security import token_cache
 
 
 class TokenBearer(HTTPBearer):
@@ -12,7 +12,7 @@ class TokenBearer(HTTPBearer):
         token = creds.credentials
 
         try:
-            token_data = decode_token(token)
+            token_data = token_cache.decode(token)
         except ExpiredSignatureError:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired")
         except JWTError:
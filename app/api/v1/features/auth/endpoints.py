@@ -1,12 +1,12 @@
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Body, status
 from fastapi.security import OAuth2PasswordRequestForm
 
 from jose import ExpiredSignatureError, JWTError
 
 from app.core.enums import TokenType
-from app.exceptions.auth import UserAlreadyActivated
+from app.exceptions.auth import UserAlreadyActivated, UserIsNotActivated
 from app.service.auth import AuthService, RegistrationService
 from app.service.user import UserService
 from app.schemas.auth import UserRegister, TokenPair
@@ -66,6 +66,15 @@ async def confirm(
     return {"msg": "Account successfully activated"}
 
 
+@router.post("/deactivate", response_model=UserModel)
+async def deactivate(
+        root: CurrentRootUser,
+        user_id: UUID = Body(..., embed=True),
+        auth_service: AuthService = Depends(get_auth_service),
+):
+    return await auth_service.deactivate_user(user_id)
+
+
 @router.post("/reset-password")
 async def reset_password():
     ...
@@ -73,6 +82,7 @@ async def reset_password():
 
 @router.post("/reset-password/confirm")
 async def confirm_reset():
+    # once the password is changed here, AuthService.logout has to revoke the tokens issued with the old one
     ...
 
 
@@ -96,11 +106,21 @@ async def refresh(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
 
     user = await user_service.get_user_by_id(token_payload["id"])
+    if not user.is_active:
+        raise UserIsNotActivated(user.username)
     response = auth_service.create_token_pair(user)
 
     return response
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+        payload: dict = Depends(get_access_token_payload),
+        auth_service: AuthService = Depends(get_auth_service),
+):
+    auth_service.logout(payload["id"])
+
+
 @router.get("/me")
 async def me(payload: dict = Depends(get_access_token_payload)):
     return payload
@@ -1,32 +1,51 @@
 from uuid import UUID
 from datetime import date
+
+from dateutil.relativedelta import relativedelta
 from fastapi import APIRouter, status, HTTPException, Depends
 
 from app.core.enums import UserRole
 from app.models import SimpleUser, AdminUser
 from app.exceptions.event import PastEventError
 from app.service.event import event_create, event_update_info, event_delete, get_event, get_event_list, \
-    get_next_occurrence, generate_missing_occurrences
+    get_next_occurrence, generate_missing_occurrences, iter_occurrences_in_range, occurrence_cancel, \
+    occurrence_reschedule
 from app.schemas.event import (
     EventCreate, EventModel, EventFull, OccurrencesView, EventOccurrenceId, EventUpdate,
-    EventNext, CalendarView, EventOccurrenceModel
+    EventNext, CalendarView, EventOccurrenceModel, EventOccurrenceReschedule
 )
-from app.api.v1.dependencies import DBSessionDepends, CurrentUserDepends, RoleChecker
+from app.api.v1.dependencies import DBSessionDepends, CurrentUserDepends, TokenRoleChecker
 
 router = APIRouter(prefix="/events", tags=["events"])
 
 
+def _upcoming_range() -> tuple[date, date]:
+    today = date.today()
+    return today, today + relativedelta(years=1)
+
+
+def _check_date_range(from_date: date, to_date: date) -> None:
+    if from_date > to_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="from_date must not be after to_date")
+
+
 @router.get("/", response_model=list[EventFull])
 async def index(
         user: CurrentUserDepends,
         db: DBSessionDepends,
 ):
     """Get all (global and user`s) next planned events"""
-    events = await get_event_list(user, db, with_occurrence=True)
+    from_date, to_date = _upcoming_range()
+    events = await get_event_list(user, db, with_occurrence=False)
+
+    upcoming = {}
+    async for occur in iter_occurrences_in_range(user, db, from_date, to_date, group_by="event"):
+        upcoming.setdefault(occur.event_id, []).append(EventOccurrenceId.model_validate(occur))
+
     response = []
     for event in events:
-        model = EventFull.model_validate(event)
-        response.append(model)
+        model = EventModel.model_validate(event)
+        response.append(EventFull(**model.model_dump(), occurrences=upcoming.get(event.id, [])))
 
     return response
 
@@ -39,15 +58,14 @@ async def index_occurrences(
         to_date: date,
 ):
     """
-    Fetches and processes occurrences of events within a specified date range. This function queries the models for
-    events and their occurrences, processes them according to user type, and returns the data in a structured response
-    format suitable for the expected response model.
+    Fetches occurrences of visible events within a specified date range. Only occurrences inside the range are read,
+    already ordered by event, and returned grouped by event id.
     """
-    events = await get_event_list(user, db, with_occurrence=True)
+    _check_date_range(from_date, to_date)
 
     response = OccurrencesView()
-    for event in events:
-        response.root[event.id] = [EventOccurrenceId.model_validate(occur) for occur in event.occurrences]
+    async for occur in iter_occurrences_in_range(user, db, from_date, to_date, group_by="event"):
+        response.root.setdefault(occur.event_id, []).append(EventOccurrenceId.model_validate(occur))
 
     return response
 
@@ -55,11 +73,12 @@ async def index_occurrences(
 @router.post(
     "/occurrences/generate",
     status_code=status.HTTP_201_CREATED,
-    dependencies=[Depends(RoleChecker(UserRole.ROOT))])
+    dependencies=[Depends(TokenRoleChecker(UserRole.ROOT))])
 async def manual_generate(
         db: DBSessionDepends,
+        catch_up: bool = False,
 ):
-        created = await generate_missing_occurrences(db)
+        created = await generate_missing_occurrences(db, catch_up=catch_up)
         return {"created": created}
 
 
@@ -71,15 +90,11 @@ async def calendar_view(
         to_date: date,
 ):
     """Return calendar-style view: occurrences grouped by date."""
-    events = await get_event_list(user, db, with_occurrence=True)
+    _check_date_range(from_date, to_date)
 
     response = CalendarView()
-    for event in events:
-        for occur in event.occurrences:
-            date_key = occur.occurrence_date
-            if date_key not in response.root:
-                response.root[date_key] = []
-            response.root[date_key].append(EventOccurrenceModel.model_validate(occur))
+    async for occur in iter_occurrences_in_range(user, db, from_date, to_date, group_by="date"):
+        response.root.setdefault(occur.occurrence_date, []).append(EventOccurrenceModel.model_validate(occur))
 
     return response
 
@@ -114,10 +129,15 @@ async def get(
         db: DBSessionDepends,
         event_id: UUID,
 ):
-    """Get event"""
-    event = await get_event(event_id, user, db, with_occurrence=True)
+    """Get event with its occurrences planned for the next year"""
+    from_date, to_date = _upcoming_range()
+    event = await get_event(event_id, user, db, with_occurrence=False)
 
-    event_full = EventFull.model_validate(event)
+    occurrences = [
+        EventOccurrenceId.model_validate(occur)
+        async for occur in iter_occurrences_in_range(user, db, from_date, to_date, event_id=event_id)
+    ]
+    event_full = EventFull(**EventModel.model_validate(event).model_dump(), occurrences=occurrences)
 
     return event_full
 
@@ -141,7 +161,7 @@ async def get_next(
 ):
     """Get event with next occurrence"""
     event = await get_event(event_id, user, db, with_occurrence=False)
-    occurrence = await get_next_occurrence(event_id, db)
+    occurrence = await get_next_occurrence(event, db)
 
     response = EventNext.model_validate(event)
     if occurrence:
@@ -190,8 +210,51 @@ async def get_occurrences(
         to_date: date,
 ):
     """Get event occurrences in date interval"""
-    event = await get_event(event_id, user, db, with_occurrence=True)
+    _check_date_range(from_date, to_date)
+    await get_event(event_id, user, db, with_occurrence=False)
 
-    response = [EventOccurrenceId.model_validate(occur) for occur in event.occurrences]
+    response = [
+        EventOccurrenceId.model_validate(occur)
+        async for occur in iter_occurrences_in_range(user, db, from_date, to_date, event_id=event_id)
+    ]
 
     return response
+
+
+@router.patch(
+    "/{event_id}/occurrences/{occurrence_date}",
+    response_model=EventOccurrenceId,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def reschedule_occurrence(
+        user: CurrentUserDepends,
+        db: DBSessionDepends,
+        event_id: UUID,
+        occurrence_date: date,
+        data: EventOccurrenceReschedule,
+):
+    """Move a single occurrence of the event to another date"""
+    event = await get_event(event_id, user, db, with_occurrence=False)
+    if isinstance(user, SimpleUser):
+        if event.is_global:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden to change global event")
+
+    occurrence = await occurrence_reschedule(event, occurrence_date, data.occurrence_date, db)
+
+    return EventOccurrenceId.model_validate(occurrence)
+
+
+@router.delete("/{event_id}/occurrences/{occurrence_date}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_occurrence(
+        user: CurrentUserDepends,
+        db: DBSessionDepends,
+        event_id: UUID,
+        occurrence_date: date,
+):
+    """Cancel a single occurrence of the event"""
+    event = await get_event(event_id, user, db, with_occurrence=False)
+    if isinstance(user, SimpleUser):
+        if event.is_global:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden to change global event")
+
+    await occurrence_cancel(event, occurrence_date, db)
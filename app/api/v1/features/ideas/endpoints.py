@@ -1,12 +1,13 @@
-from typing import List
+from typing import List, Annotated, Literal
 from uuid import UUID
 
-from fastapi import APIRouter, status, Depends
+from fastapi import APIRouter, status, Depends, Response, Body, Query
 
-from app.schemas.idea import IdeaCreate, IdeaModel, IdeaUpdateInfo
+from app.schemas.idea import IdeaCreate, IdeaModel, IdeaUpdateInfo, IdeaBulkUpdate
+from app.schemas.bulk import BulkIds, MAX_BULK_ITEMS
 from app.service.idea import IdeaService
 from app.api.v1.dependencies import CurrentUserDepends
-from app.api.v1.pagination import PaginationParams
+from app.api.v1.pagination import PaginationParams, SearchParams, paginated
 from .dependencies import get_idea_service, IdeaFilterParams, IdeaSortingParams
 
 router = APIRouter(prefix="/ideas", tags=["ideas"])
@@ -21,39 +22,86 @@ async def create(
     return await idea_service.create(user, data)
 
 
+# declared before the "/{idea_id}" routes, which would otherwise match "bulk"
+@router.post("/bulk", response_model=List[IdeaModel], status_code=status.HTTP_201_CREATED)
+async def create_many(
+        user: CurrentUserDepends,
+        data: Annotated[List[IdeaCreate], Body(min_length=1, max_length=MAX_BULK_ITEMS)],
+        idea_service: IdeaService = Depends(get_idea_service),
+):
+    return await idea_service.create_many(user, data)
+
+
+@router.patch("/bulk", response_model=List[IdeaModel], status_code=status.HTTP_202_ACCEPTED)
+async def update_many(
+        user: CurrentUserDepends,
+        data: Annotated[List[IdeaBulkUpdate], Body(min_length=1, max_length=MAX_BULK_ITEMS)],
+        idea_service: IdeaService = Depends(get_idea_service),
+):
+    return await idea_service.update_many(user, data)
+
+
+@router.delete("/bulk", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_many(
+        user: CurrentUserDepends,
+        data: BulkIds,
+        idea_service: IdeaService = Depends(get_idea_service),
+):
+    await idea_service.soft_delete_many(user, data.ids)
+
+
 @router.get("/my", response_model=List[IdeaModel])
 async def index_my(
         user: CurrentUserDepends,
+        response: Response,
         pagination: PaginationParams = Depends(),
         sorting: IdeaSortingParams = Depends(),
         filters: IdeaFilterParams = Depends(),
         idea_service: IdeaService = Depends(get_idea_service),
 ):
-    return await idea_service.get_user_ideas(
+    page = await idea_service.get_user_ideas(
         user,
         pagination.limit,
         pagination.offset,
         sorting.order_by,
         sorting.desc,
-        filters.to_filters()
+        filters.to_filters(),
+        pagination.cursor,
+        pagination.total,
     )
+    return paginated(response, page)
 
 
 @router.get("/global", response_model=List[IdeaModel])
 async def index_global(
         user: CurrentUserDepends,
+        response: Response,
         pagination: PaginationParams = Depends(),
         sorting: IdeaSortingParams = Depends(),
         filters: IdeaFilterParams = Depends(),
         idea_service: IdeaService = Depends(get_idea_service),
 ):
-    return await idea_service.get_global_ideas(
+    page = await idea_service.get_global_ideas(
         pagination.limit,
         pagination.offset,
         sorting.order_by,
         sorting.desc,
-        filters.to_filters()
+        filters.to_filters(),
+        pagination.cursor,
+        pagination.total,
     )
+    return paginated(response, page)
+
+
+@router.get("/search", response_model=List[IdeaModel])
+async def search(
+        user: CurrentUserDepends,
+        params: SearchParams = Depends(),
+        scope: Literal["my", "global"] = Query("my"),
+        archived: bool = Query(False),
+        idea_service: IdeaService = Depends(get_idea_service),
+):
+    return await idea_service.search(user, params.q, scope, params.limit, params.offset, archived)
 
 
 @router.get("/{idea_id}", response_model=IdeaModel)
@@ -1,10 +1,8 @@
-from typing import List
-from io import BytesIO
+from typing import List, BinaryIO
 
 from fastapi import UploadFile, HTTPException, status
-from PIL import Image, UnidentifiedImageError
 
-from app.utils.media import calculate_hash
+from app.utils.media import inspect_image, media_executor
 from app.schemas.media import MediaFileMeta
 
 
@@ -12,44 +10,33 @@ ALLOWED_MIME_TYPES = {"image/png", "image/jpeg"}
 MAX_FILE_SIZE = 5 * 1024 * 1024
 
 
-async def extract_image_data(file: UploadFile) -> tuple[MediaFileMeta, bytes]:
+async def extract_image_data(file: UploadFile) -> tuple[MediaFileMeta, BinaryIO]:
     filename = file.filename
     content_type = file.content_type
     if content_type not in ALLOWED_MIME_TYPES:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported file type")
-
-    file_bytes = await file.read()
-    size_bytes = len(file_bytes)
-    if size_bytes > MAX_FILE_SIZE:
+    if file.size is not None and file.size > MAX_FILE_SIZE:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File too large")
 
-    try:
-        image = Image.open(BytesIO(file_bytes))
-        image.verify()
-    except UnidentifiedImageError:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid image file")
-
-    width, height = image.size
-    ratio = width / height
-
-    file_hash = calculate_hash(file_bytes)
+    # the upload is already spooled by the server; hashing and probing stream it in the media pool
+    probe = await media_executor.run(inspect_image, file.file, MAX_FILE_SIZE)
 
     return MediaFileMeta(
         filename=filename,
         mime_type=content_type,
-        size_bytes=size_bytes,
-        width=width,
-        height=height,
-        ratio=ratio,
-        hash=file_hash,
-    ), file_bytes
+        size_bytes=probe.size_bytes,
+        width=probe.width,
+        height=probe.height,
+        ratio=probe.width / probe.height,
+        hash=probe.hash,
+    ), file.file
 
 
-async def extract_images_data(files: List[UploadFile]) -> tuple[List[MediaFileMeta], List[bytes]]:
+async def extract_images_data(files: List[UploadFile]) -> tuple[List[MediaFileMeta], List[BinaryIO]]:
     datas = []
-    bytes_list = []
+    file_objects = []
     for file in files:
-        data, file_bytes = await extract_image_data(file)
+        data, file_object = await extract_image_data(file)
         datas.append(data)
-        bytes_list.append(file_bytes)
-    return datas, bytes_list
\ No newline at end of file
+        file_objects.append(file_object)
+    return datas, file_objects
@@ -1,12 +1,15 @@
-from typing import List
+from typing import List, BinaryIO
+from uuid import UUID
 
-from fastapi import APIRouter, UploadFile, status, Depends
+from fastapi import APIRouter, UploadFile, status, Depends, BackgroundTasks
 
+from app.core.database import unit_of_work
 from app.core.enums import MediaType
+from app.models import MediaFile
 from app.repositories.orm.media import MediaRepository
 from app.schemas.media import MediaFileMeta, MediaFileRead
-from app.storage import S3MediaStorage
-from app.service.media import MediaUploaderService, AvaMediaValidator, ContentMediaValidator
+from app.storage import get_media_storage
+from app.service.media import MediaUploaderService, MediaVariantService, AvaMediaValidator, ContentMediaValidator
 from app.api.v1.dependencies import DBSessionDepends
 from .dependencies import extract_image_data, extract_images_data
 
@@ -14,17 +17,35 @@ from .dependencies import extract_image_data, extract_images_data
 router = APIRouter(prefix="/media", tags=["media"])
 
 
+async def generate_variants(media_id: UUID, source_path: str) -> None:
+    try:
+        async with unit_of_work() as db:
+            variants = await MediaVariantService(MediaRepository(db), get_media_storage()).generate(media_id, source_path)
+        print(f"[Media] Generated {len(variants)} variants of {source_path}")
+    except Exception as e:
+        print(f"[Media] Failed to generate variants of {source_path}: {e}")
+
+
+def schedule_variants(background_tasks: BackgroundTasks):
+    def on_created(media: MediaFile, path: str) -> None:
+        background_tasks.add_task(generate_variants, media.id, path)
+    return on_created
+
+
 @router.post("/upload/avatar", status_code=status.HTTP_201_CREATED, response_model=MediaFileRead)
 async def upload_ava(
         db: DBSessionDepends,
         file: UploadFile,
-        extracted: tuple[MediaFileMeta, bytes] = Depends(extract_image_data),
+        background_tasks: BackgroundTasks,
+        extracted: tuple[MediaFileMeta, BinaryIO] = Depends(extract_image_data),
 ):
     """upload ava for user or recipient"""
-    data, file_bytes = extracted
+    data, file_object = extracted
 
-    uploader = MediaUploaderService(MediaRepository(db), S3MediaStorage(), AvaMediaValidator())
-    media = await uploader.upload_one(file_bytes, data, MediaType.AVATAR)
+    uploader = MediaUploaderService(
+        MediaRepository(db), get_media_storage(), AvaMediaValidator(), on_created=schedule_variants(background_tasks)
+    )
+    media = await uploader.upload_one(file_object, data, MediaType.AVATAR)
 
     return media
 
@@ -33,11 +54,14 @@ async def upload_ava(
 async def upload_content(
         db: DBSessionDepends,
         files: List[UploadFile],
-        extracted_list: tuple[List[MediaFileMeta], List[bytes]] = Depends(extract_images_data),
+        background_tasks: BackgroundTasks,
+        extracted_list: tuple[List[MediaFileMeta], List[BinaryIO]] = Depends(extract_images_data),
 ):
     """upload media for idea or gifts"""
-    datas, file_bytes_list = extracted_list
+    datas, file_objects = extracted_list
 
-    uploader = MediaUploaderService(MediaRepository(db), S3MediaStorage(), ContentMediaValidator())
-    media = await uploader.upload_many(file_bytes_list, datas, MediaType.CONTENT)
+    uploader = MediaUploaderService(
+        MediaRepository(db), get_media_storage(), ContentMediaValidator(), on_created=schedule_variants(background_tasks)
+    )
+    media = await uploader.upload_many(file_objects, datas, MediaType.CONTENT)
     return media
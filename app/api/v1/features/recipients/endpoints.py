@@ -1,11 +1,14 @@
 from uuid import UUID
-from fastapi import APIRouter, status, Depends
+from typing import Annotated
+
+from fastapi import APIRouter, status, Depends, Response, Body
 
 from app.service.recipient import RecipientService
 from app.schemas.recipient import RecipientCreate, RecipientModel, RecipientUpdateInfo, \
     RecipientUpdateBirthday
+from app.schemas.bulk import MAX_BULK_ITEMS
 from app.api.v1.dependencies import CurrentUserDepends, CurrentSimpleUser
-from app.api.v1.pagination import PaginationParams
+from app.api.v1.pagination import PaginationParams, SearchParams, paginated
 from .dependencies import get_recipient_service, RecipientSortingParams, RecipientFilterParams
 
 
@@ -15,22 +18,35 @@ router = APIRouter(prefix="/recipients", tags=["recipients"])
 @router.get("/", response_model=list[RecipientModel])
 async def index_my(
         user: CurrentSimpleUser,
+        response: Response,
         pagination: PaginationParams = Depends(),
         sorting: RecipientSortingParams = Depends(),
         filters: RecipientFilterParams = Depends(),
         recipient_service: RecipientService = Depends(get_recipient_service),
 ):
     """Get list of user recipients"""
-    recipients = await recipient_service.list_my(
+    page = await recipient_service.list_my(
         user,
         limit=pagination.limit,
         offset=pagination.offset,
         order_by=sorting.order_by,
         desc_order=sorting.desc,
         filters=filters.to_filters(),
+        cursor=pagination.cursor,
+        count_mode=pagination.total,
     )
 
-    return recipients
+    return paginated(response, page)
+
+
+@router.get("/search", response_model=list[RecipientModel])
+async def search(
+        user: CurrentSimpleUser,
+        params: SearchParams = Depends(),
+        recipient_service: RecipientService = Depends(get_recipient_service),
+):
+    """Search user recipients, best match first"""
+    return await recipient_service.search(user, params.q, params.limit, params.offset)
 
 
 @router.get("/{recipient_id}", response_model=RecipientModel)
@@ -58,6 +74,18 @@ async def create(
     return recipient
 
 
+@router.post(
+    "/bulk", response_model=list[RecipientModel], status_code=status.HTTP_201_CREATED,
+)
+async def create_many(
+        user: CurrentSimpleUser,
+        data: Annotated[list[RecipientCreate], Body(min_length=1, max_length=MAX_BULK_ITEMS)],
+        recipient_service: RecipientService = Depends(get_recipient_service),
+):
+    """Create many recipients at once"""
+    return await recipient_service.create_many(user, data)
+
+
 @router.patch("/{recipient_id}", response_model=RecipientModel, status_code=status.HTTP_202_ACCEPTED)
 async def update_info(
         user: CurrentUserDepends,
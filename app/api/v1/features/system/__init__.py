@@ -0,0 +1 @@
+from .endpoints import router
\ No newline at end of file
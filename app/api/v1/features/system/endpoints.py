@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends
+
+from app.core.enums import UserRole
+from app.core.database import pool_stats
+from app.api.v1.dependencies import TokenRoleChecker
+from app.service.media.variants import variant_executor
+from app.utils.media import media_executor
+from app.utils.security import password_executor
+
+router = APIRouter(prefix="/system", tags=["system"])
+
+
+@router.get("/db-pool", dependencies=[Depends(TokenRoleChecker(UserRole.ROOT))])
+async def db_pool():
+    """Connection pool usage of the primary and replica engines."""
+    return pool_stats()
+
+
+@router.get("/executors", dependencies=[Depends(TokenRoleChecker(UserRole.ROOT))])
+async def executors():
+    """Worker, queue and rejection counters of the thread pools that keep blocking work off the event loop."""
+    return {
+        "password": password_executor.stats(),
+        "media": media_executor.stats(),
+        "variants": variant_executor.stats(),
+    }
@@ -1,12 +1,40 @@
-from typing import Optional, ClassVar
+from typing import Optional, ClassVar, List, TypeVar
 
-from fastapi import Query
+from fastapi import Query, Response
 from pydantic import BaseModel, field_validator
 
+from app.schemas.pagination import Page, CountMode
+
+
+T = TypeVar("T")
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_ESTIMATED_HEADER = "X-Total-Count-Estimated"
+
 
 class PaginationParams(BaseModel):
     limit: int = Query(default=20, ge=1, le=100)
     offset: int = Query(default=0, ge=0)
+    cursor: Optional[str] = Query(default=None, description="Opaque cursor from X-Next-Cursor; replaces offset")
+    total: CountMode = Query(default="none", description="Return the number of matching rows in X-Total-Count")
+
+
+class SearchParams(BaseModel):
+    q: str = Query(min_length=1, max_length=200, description="Words to look for; the last one may be a prefix")
+    limit: int = Query(default=20, ge=1, le=100)
+    offset: int = Query(default=0, ge=0)
+
+
+def paginated(response: Response, page: Page[T]) -> List[T]:
+    """Expose page metadata as response headers and return the items as the body."""
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if page.total is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(page.total)
+        if page.total_is_estimate:
+            response.headers[TOTAL_ESTIMATED_HEADER] = "true"
+    return page.items
 
 
 class BaseSortingParams(BaseModel):
@@ -6,6 +6,7 @@ from .features.events import router as event_router
 from .features.ideas import router as idea_router
 from .features.media import router as media_router
 from .features.users import router as user_router
+from .features.system import router as system_router
 
 
 api_router = APIRouter(prefix="/api/v1")
@@ -16,3 +17,4 @@ api_router.include_router(recipient_router)
 api_router.include_router(event_router)
 api_router.include_router(idea_router)
 api_router.include_router(media_router)
+api_router.include_router(system_router)
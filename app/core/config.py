@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal, Optional, List
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -10,21 +11,71 @@ class Settings(BaseSettings):
     DEBUG: bool = False
 
     DATABASE_URL: str
+    DATABASE_REPLICA_URL: Optional[str] = None
+    DATABASE_REPLICA_STICKY_SECONDS: int = 5
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT_SECONDS: float = 10
+    DATABASE_POOL_RECYCLE_SECONDS: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_STATEMENT_TIMEOUT_MS: int = 30_000
+    # asyncpg's per-connection cache of prepared statements; set to 0 behind pgbouncer in transaction mode
+    DATABASE_STATEMENT_CACHE_SIZE: int = 100
 
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     ACTIVATION_TOKEN_EXPIRE_HOURS: int = 24
+    # role checks read the access token's role claim without loading the user: a deactivated or deleted user keeps
+    # access until the token expires, unless its tokens are revoked (per process, see VerifiedTokenCache)
+    AUTH_TRUST_ROLE_CLAIM: bool = False
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    # revocations are never evicted; past this many, users are checked in the database until the overflow expires
+    TOKEN_REVOCATIONS_MAX_SIZE: int = 100000
+    PASSWORD_HASH_WORKERS: int = 4
 
-    AWS_ACCESS_KEY: str
-    AWS_SECRET_ACCESS_KEY: str
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_MAX_SIZE: int = 10000
+
+    AWS_ACCESS_KEY: Optional[str] = None
+    AWS_SECRET_ACCESS_KEY: Optional[str] = None
     AWS_REGION: str = "eu-central-1"
-    AWS_BUCKET_NAME: str
+    AWS_BUCKET_NAME: Optional[str] = None
+    AWS_S3_MAX_POOL_CONNECTIONS: int = 50
+    AWS_S3_MULTIPART_THRESHOLD: int = 8 * 1024 * 1024
+    AWS_S3_MULTIPART_CHUNKSIZE: int = 8 * 1024 * 1024
+    AWS_S3_MAX_CONCURRENCY: int = 4
+    AWS_S3_EXISTS_CACHE_TTL_SECONDS: int = 60
+    AWS_S3_EXISTS_CACHE_MAX_SIZE: int = 100_000
+
+    MEDIA_STORAGE_BACKEND: Literal["s3", "local"] = "s3"
+    MEDIA_LOCAL_ROOT: str = "media"
+    MEDIA_LOCAL_BASE_URL: str = "http://localhost:8000/media"
+
+    MEDIA_UPLOAD_CONCURRENCY: int = 4
+    MEDIA_KNOWN_HASHES_CAPACITY: int = 1_000_000
+    MEDIA_PROBE_WORKERS: int = 4
+    MEDIA_PROBE_MAX_QUEUED: int = 32
+    MEDIA_VARIANT_WIDTHS: List[int] = [64, 256, 1024]
+    MEDIA_VARIANT_FORMATS: List[str] = ["webp"]
+    MEDIA_VARIANT_WORKERS: int = 2
 
     MAIL_ENABLED: bool = False
     MAIL_SENDGRID_API_KEY: str
     MAIL_SENDER_EMAIL: str
+    MAIL_BACKEND: Literal["outbox", "sendgrid", "console", "file"] = "outbox"
+    MAIL_TRANSPORT: Literal["sendgrid", "console", "file"] = "sendgrid"
+    MAIL_FILE_PATH: str = "mail.jsonl"
+    MAIL_TEMPLATES_COMPILED_PATH: Optional[str] = None
+    MAIL_OUTBOX_POLL_SECONDS: int = 10
+    MAIL_OUTBOX_BATCH_SIZE: int = 100
+    MAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    MAIL_OUTBOX_RETRY_BASE_SECONDS: int = 30
+
+    EVENT_OCCURRENCES_MATERIALIZE: bool = False
+    EVENT_OCCURRENCES_CHUNK_SIZE: int = 1000
 
 
 @lru_cache
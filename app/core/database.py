@@ -1,10 +1,109 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
 from app.core.config import get_settings
 
 settings = get_settings()
 
 
-DATABASE_URL = settings.DATABASE_URL.replace("postgres://", "postgresql://", 1)
+def _normalize_url(url: str) -> str:
+    return url.replace("postgres://", "postgresql://", 1)
+
+
+def engine_options(url: str, read_only: bool = False) -> Dict[str, Any]:
+    """Keyword arguments of ``create_async_engine`` for ``url``, taken from the ``DATABASE_*`` settings."""
+    options: Dict[str, Any] = {"echo": settings.DEBUG}
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        # SQLite picks its own pool class, which does not take the sizing options
+        return options
+
+    options.update(
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+    )
+    if url.get_driver_name() == "asyncpg":
+        server_settings = {
+            "application_name": settings.APP_NAME,
+            "statement_timeout": str(settings.DATABASE_STATEMENT_TIMEOUT_MS),
+        }
+        if read_only:
+            server_settings["default_transaction_read_only"] = "on"
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        }
+    return options
+
 
-engine = create_async_engine(DATABASE_URL, echo=settings.DEBUG)
+DATABASE_URL = _normalize_url(settings.DATABASE_URL)
+
+engine = create_async_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 async_session = async_sessionmaker(engine, expire_on_commit=False)
+
+# without a replica, read-only sessions use the primary
+replica_engine: Optional[AsyncEngine] = None
+if settings.DATABASE_REPLICA_URL:
+    DATABASE_REPLICA_URL = _normalize_url(settings.DATABASE_REPLICA_URL)
+    replica_engine = create_async_engine(DATABASE_REPLICA_URL, **engine_options(DATABASE_REPLICA_URL, read_only=True))
+replica_session = async_sessionmaker(replica_engine or engine, expire_on_commit=False)
+
+
+@asynccontextmanager
+async def unit_of_work(factory: async_sessionmaker = async_session) -> AsyncIterator[AsyncSession]:
+    """Session whose changes are committed once, when the block exits without an error."""
+    async with factory() as session:
+        try:
+            yield session
+        except BaseException:
+            await session.rollback()
+            raise
+        if session.in_transaction():
+            await session.commit()
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """
+    Call ``callback`` once the transaction of ``session`` is committed, e.g. to drop cache entries of changed rows
+    only when other requests can read the new ones; a rollback discards it.
+    """
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    for callback in session.info.pop("after_commit", []):
+        callback()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_commit(session: Session, previous_transaction: SessionTransaction) -> None:
+    # the rollback of a savepoint keeps the callbacks of the enclosing transaction
+    if previous_transaction.parent is None:
+        session.info.pop("after_commit", None)
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Connection pool usage of every engine, e.g. for a metrics exporter."""
+    engines = {"primary": engine}
+    if replica_engine is not None:
+        engines["replica"] = replica_engine
+
+    result = {}
+    for name, current in engines.items():
+        pool = current.pool
+        stats = {"pool": type(pool).__name__, "status": pool.status()}
+        # only queue pools keep counters; SQLite's static and null pools do not
+        for key in ("size", "checkedin", "checkedout", "overflow"):
+            counter = getattr(pool, key, None)
+            if counter is not None:
+                stats[key] = counter()
+        result[name] = stats
+    return result
@@ -22,4 +22,9 @@ class UserRole(Enum):
 class TokenType(Enum):
     access = "access"
     refresh = "refresh"
-    activation = "activation"
\ No newline at end of file
+    activation = "activation"
+
+class MailStatus(Enum):
+    PENDING = "PENDING"
+    SENT = "SENT"
+    DEAD = "DEAD"
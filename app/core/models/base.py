@@ -13,3 +13,5 @@ convention = {
 
 class Base(DeclarativeBase):
     metadata = MetaData(naming_convention=convention)
+    # server-generated columns come back with the INSERT/UPDATE through RETURNING instead of a refresh
+    __mapper_args__ = {"eager_defaults": True}
@@ -0,0 +1,92 @@
+import re
+from typing import Sequence, List
+
+from sqlalchemy import DDL, Index, Table, Select, ColumnElement, event, func, literal_column, text, and_, or_, false
+from sqlalchemy.sql import table, column
+
+
+MAX_SEARCH_TERMS = 8
+
+_TERM = re.compile(r"\w+")
+
+
+def search_terms(query: str) -> List[str]:
+    """Words of a user query; everything else is dropped, so terms are safe to embed in a match expression."""
+    return _TERM.findall(query.lower())[:MAX_SEARCH_TERMS]
+
+
+class SearchIndex:
+    """
+    Ranked prefix search over the text ``columns`` of ``table``, where every query term has to match.
+
+    PostgreSQL matches ``to_tsvector`` of the columns against a ``tsquery`` through an expression GIN index and ranks
+    with ``ts_rank_cd``; the columns also get trigram GIN indexes, which serve the ``__icontains`` filters. SQLite
+    keeps an FTS5 external-content table in sync with triggers and ranks with ``bm25``. Other backends fall back to
+    ``LIKE`` without ranking.
+    """
+
+    def __init__(self, table_: Table, columns: Sequence[str], config: str = "simple"):
+        self.table = table_
+        self.columns = tuple(columns)
+        self.fts_name = f"{table_.name}_fts"
+        # rendered inline, so that queries repeat the indexed expression exactly; plain text instead of a
+        # literal column, which the index would mistake for the column of another table
+        self._config = text(f"'{config}'::regconfig")
+
+        Index(f"ix_{table_.name}_search", self.document(), postgresql_using="gin").ddl_if(dialect="postgresql")
+        for name in self.columns:
+            Index(
+                f"ix_{table_.name}_{name}_trgm", table_.c[name],
+                postgresql_using="gin", postgresql_ops={name: "gin_trgm_ops"},
+            ).ddl_if(dialect="postgresql")
+
+        event.listen(
+            table_.metadata, "before_create",
+            DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+        )
+        for statement in self.sqlite_ddl():
+            event.listen(table_, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+        event.listen(table_, "before_drop", DDL(f"DROP TABLE IF EXISTS {self.fts_name}").execute_if(dialect="sqlite"))
+
+    def document(self) -> ColumnElement:
+        content = None
+        for name in self.columns:
+            value = func.coalesce(self.table.c[name], text("''"))
+            content = value if content is None else content.op("||")(text("' '")).op("||")(value)
+        return func.to_tsvector(self._config, content)
+
+    def sqlite_ddl(self) -> List[str]:
+        name, fts = self.table.name, self.fts_name
+        columns = ", ".join(self.columns)
+        new = ", ".join(f"new.{c}" for c in self.columns)
+        old = ", ".join(f"old.{c}" for c in self.columns)
+        insert = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.rowid, {new});"
+        delete = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.rowid, {old});"
+        return [
+            f"CREATE VIRTUAL TABLE {fts} USING fts5({columns}, content='{name}', tokenize='unicode61 remove_diacritics 2')",
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {name} BEGIN {insert} END",
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {name} BEGIN {delete} END",
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {name} BEGIN {delete} {insert} END",
+        ]
+
+    def apply(self, stmt: Select, dialect: str, query: str) -> Select:
+        """Restrict ``stmt`` to the rows matching ``query`` and order them by relevance."""
+        terms = search_terms(query)
+        if not terms:
+            return stmt.where(false())
+
+        if dialect == "postgresql":
+            document = self.document()
+            tsquery = func.to_tsquery(self._config, " & ".join(f"{term}:*" for term in terms))
+            return stmt.where(document.op("@@")(tsquery)).order_by(func.ts_rank_cd(document, tsquery).desc())
+
+        if dialect == "sqlite":
+            fts = table(self.fts_name, column("rowid"), column("rank"))
+            match = " ".join(f'"{term}"*' for term in terms)
+            stmt = stmt.join(fts, fts.c.rowid == literal_column(f"{self.table.name}.rowid"))
+            # FTS5's rank column is bm25, lower is better
+            return stmt.where(literal_column(self.fts_name).op("MATCH")(match)).order_by(fts.c.rank)
+
+        return stmt.where(and_(*(
+            or_(*(self.table.c[name].ilike(f"%{term}%") for name in self.columns)) for term in terms
+        )))
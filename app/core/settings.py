@@ -1,7 +1,37 @@
-from jinja2 import Environment, FileSystemLoader
+from pathlib import Path
 
+from jinja2 import Environment, FileSystemLoader, ModuleLoader, BaseLoader
 
+from app.core.config import get_settings
+
+settings = get_settings()
+
+MAIL_TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "mail_templates"
+
+
+def _mail_templates_loader() -> BaseLoader:
+    if settings.MAIL_TEMPLATES_COMPILED_PATH:
+        return ModuleLoader(settings.MAIL_TEMPLATES_COMPILED_PATH)
+    return FileSystemLoader(MAIL_TEMPLATES_DIR)
+
+
+# templates are only re-checked on disk in debug mode; values shared by every mail are globals
 jinja_env = Environment(
-    loader=FileSystemLoader("app/mail_templates"),
-    enable_async=True,
-)
\ No newline at end of file
+    loader=_mail_templates_loader(),
+    auto_reload=settings.DEBUG,
+    cache_size=-1,
+)
+jinja_env.globals["app_name"] = settings.APP_NAME
+
+
+def precompile_mail_templates() -> int:
+    """Load every mail template into the environment cache, so that the first mail does not compile it."""
+    names = [path.name for path in MAIL_TEMPLATES_DIR.glob("*.html")]
+    for name in names:
+        jinja_env.get_template(name)
+    return len(names)
+
+
+def compile_mail_templates(target: str) -> None:
+    """Compile the mail templates ahead of time into ``target``, to be used as ``MAIL_TEMPLATES_COMPILED_PATH``."""
+    Environment(loader=FileSystemLoader(MAIL_TEMPLATES_DIR)).compile_templates(target, zip=None)
@@ -10,4 +10,13 @@ class NotFoundError(GiftAppError):
 
 class PolicyPermissionError(GiftAppError):
     def __init__(self, message: str):
-        super().__init__(message, 401)
\ No newline at end of file
+        super().__init__(message, 401)
+
+class InvalidCursor(GiftAppError):
+    def __init__(self, message: str):
+        super().__init__(f"Invalid cursor: {message}", status_code=400)
+
+
+class ServiceBusy(GiftAppError):
+    def __init__(self, resource: str):
+        super().__init__(f"{resource} is busy, try again later", status_code=503)
@@ -1,32 +1,203 @@
+import json
+import asyncio
 from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Sequence, Dict, List, Tuple
 
 from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+from sendgrid.helpers.mail import Mail, Personalization, To
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
+from app.core.enums import MailStatus
+from app.models import OutboxMail
 
 settings = get_settings()
 
 
+class BulkSendError(Exception):
+    """A bulk send that failed after the message had been delivered to ``delivered``."""
+
+    def __init__(self, delivered: Sequence[str], error: Exception):
+        super().__init__(repr(error))
+        self.delivered = list(delivered)
+        self.error = error
+
+
 class MailSender(ABC):
     @abstractmethod
-    def send_mail(self, to: str, subject: str, html_content: str) -> None:
+    async def send_mail(self, to: str, subject: str, html_content: str) -> None:
         ...
 
+    async def send_bulk(self, to: Sequence[str], subject: str, html_content: str) -> None:
+        """Send the same message to every recipient separately; a failure raises ``BulkSendError``."""
+        for i, recipient in enumerate(to):
+            try:
+                await self.send_mail(recipient, subject, html_content)
+            except Exception as e:
+                raise BulkSendError(to[:i], e) from e
+
 
 class SendgridMailSender(MailSender):
+    # SendGrid accepts at most 1000 personalizations per request
+    MAX_PERSONALIZATIONS = 1000
+
     def __init__(self):
         self._client = SendGridAPIClient(settings.MAIL_SENDGRID_API_KEY)
         self._from_email = settings.MAIL_SENDER_EMAIL
 
-    def send_mail(self, to: str, subject: str, html_content: str) -> None:
+    async def send_mail(self, to: str, subject: str, html_content: str) -> None:
         message = Mail(
             from_email=self._from_email,
             to_emails=to,
             subject=subject,
             html_content=html_content,
         )
-        self._client.send(message)
+        await asyncio.to_thread(self._client.send, message)
+
+    async def send_bulk(self, to: Sequence[str], subject: str, html_content: str) -> None:
+        for start in range(0, len(to), self.MAX_PERSONALIZATIONS):
+            message = Mail(from_email=self._from_email, subject=subject, html_content=html_content)
+            # one personalization per recipient, so recipients do not see each other
+            for recipient in to[start:start + self.MAX_PERSONALIZATIONS]:
+                personalization = Personalization()
+                personalization.add_to(To(recipient))
+                message.add_personalization(personalization)
+            try:
+                await asyncio.to_thread(self._client.send, message)
+            except Exception as e:
+                raise BulkSendError(to[:start], e) from e
+
+
+class ConsoleMailSender(MailSender):
+    async def send_mail(self, to: str, subject: str, html_content: str) -> None:
+        print(f"[Mail] To: {to} | Subject: {subject}\n{html_content}")
+
+
+class FileMailSender(MailSender):
+    """Appends every message as a JSON line to a local file instead of sending it."""
+
+    def __init__(self, path: str = None):
+        self.path = path or settings.MAIL_FILE_PATH
+
+    async def send_mail(self, to: str, subject: str, html_content: str) -> None:
+        line = json.dumps({"to": to, "subject": subject, "html_content": html_content})
+        with open(self.path, "a", encoding="UTF-8") as f:
+            f.write(line + "\n")
+
+
+class OutboxMailSender(MailSender):
+    """Stores messages in the outbox table; ``drain_outbox`` delivers them later."""
+
+    def __init__(self, db: AsyncSession):
+        self._db = db
+
+    async def send_mail(self, to: str, subject: str, html_content: str) -> None:
+        await self.send_bulk([to], subject, html_content)
+
+    async def send_bulk(self, to: Sequence[str], subject: str, html_content: str) -> None:
+        now = datetime.utcnow()
+        self._db.add_all([
+            OutboxMail(to_email=recipient, subject=subject, html_content=html_content, next_attempt_at=now)
+            for recipient in to
+        ])
+        # committed together with the change that triggered the mail
+        await self._db.flush()
+
+
+_TRANSPORTS = {
+    "sendgrid": SendgridMailSender,
+    "console": ConsoleMailSender,
+    "file": FileMailSender,
+}
+
+
+def get_mail_transport() -> MailSender:
+    """Sender that actually delivers messages, used by the outbox worker."""
+    return _TRANSPORTS[settings.MAIL_TRANSPORT]()
+
+
+def get_mail_sender(db: AsyncSession) -> MailSender:
+    """Sender used while handling requests."""
+    if settings.MAIL_BACKEND == "outbox":
+        return OutboxMailSender(db)
+    return _TRANSPORTS[settings.MAIL_BACKEND]()
+
+
+MAX_RETRY_DELAY = timedelta(hours=6)
+
+
+def _retry_delay(attempts: int, base_seconds: int) -> timedelta:
+    return min(timedelta(seconds=base_seconds * 2 ** (attempts - 1)), MAX_RETRY_DELAY)
+
+
+def _mark_sent(mail: OutboxMail, now: datetime) -> None:
+    mail.status = MailStatus.SENT.value
+    mail.sent_at = now
+
+
+def _mark_failed(mail: OutboxMail, error: Exception, now: datetime, max_attempts: int, retry_base_seconds: int) -> None:
+    mail.attempts += 1
+    mail.last_error = repr(error)
+    if mail.attempts >= max_attempts:
+        mail.status = MailStatus.DEAD.value
+    else:
+        mail.next_attempt_at = now + _retry_delay(mail.attempts, retry_base_seconds)
+
+
+async def drain_outbox(
+        db: AsyncSession,
+        transport: MailSender,
+        batch_size: int = 100,
+        max_attempts: int = 8,
+        retry_base_seconds: int = 30,
+) -> int:
+    """
+    Deliver due outbox messages in batches and return how many were sent.
+
+    Messages of a batch with the same subject and body go out in one bulk call. A failed call schedules the messages
+    it did not deliver again with exponential backoff; after ``max_attempts`` failures they are marked as dead.
+    """
+    sent = 0
+    while True:
+        now = datetime.utcnow()
+        stmt = (
+            select(OutboxMail)
+            .where(OutboxMail.status == MailStatus.PENDING.value, OutboxMail.next_attempt_at <= now)
+            .order_by(OutboxMail.next_attempt_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        batch = list((await db.execute(stmt)).scalars().all())
+        if not batch:
+            return sent
+
+        groups: Dict[Tuple[str, str], List[OutboxMail]] = {}
+        for mail in batch:
+            groups.setdefault((mail.subject, mail.html_content), []).append(mail)
+
+        for (subject, html_content), mails in groups.items():
+            try:
+                await transport.send_bulk([mail.to_email for mail in mails], subject, html_content)
+            except Exception as e:
+                # only the messages that did not go out are retried, the others are not sent twice
+                delivered = set(e.delivered) if isinstance(e, BulkSendError) else set()
+                error = e.error if isinstance(e, BulkSendError) else e
+                for mail in mails:
+                    if mail.to_email in delivered:
+                        _mark_sent(mail, now)
+                        sent += 1
+                    else:
+                        _mark_failed(mail, error, now, max_attempts, retry_base_seconds)
+            else:
+                for mail in mails:
+                    _mark_sent(mail, now)
+                sent += len(mails)
+
+        await db.commit()
+        if len(batch) < batch_size:
+            return sent
 
 # ---
 
@@ -41,19 +212,26 @@ class EmailData:
     subject: str
 
 
+ACTIVATE_ACCOUNT_SUBJECT = f"{settings.APP_NAME} - Activate Account"
+RESET_PASSWORD_SUBJECT = f"{settings.APP_NAME} - Reset Password"
+
+
 async def render_email(template_name: str, context: Dict[str, Any]) -> str:
-    html = await jinja_env.get_template(f"{template_name}").render_async(**context)
+    html = jinja_env.get_template(f"{template_name}").render(**context)
     return html
 
 
+async def render_email_batch(template_name: str, contexts: Sequence[Dict[str, Any]]) -> List[str]:
+    """Render one template for many recipients in a single pass, off the event loop."""
+    template = jinja_env.get_template(template_name)
+    return await asyncio.to_thread(lambda: [template.render(**context) for context in contexts])
+
+
 async def generate_activate_account_email(email_to: str, token: str) -> EmailData:
-    app_name = settings.APP_NAME
     link = f"google.com/activate?token={token}"
-    subject = f"{app_name} - Activate Account"
     html_content = await render_email(
         template_name="activate_account.html",
         context={
-            "app_name": app_name,
             "username": email_to,
             "link": link,
 
@@ -61,23 +239,20 @@ async def generate_activate_account_email(email_to: str, token: str) -> EmailDat
     )
     return EmailData(
         html_content=html_content,
-        subject=subject,
+        subject=ACTIVATE_ACCOUNT_SUBJECT,
     )
 
 
 async def generate_reset_password_email(email_to: str, token: str) -> EmailData:
-    app_name = settings.APP_NAME
     link = f"google.com/reset-password?token={token}"
-    subject = f"{app_name} - Reset Password"
     html_content = await render_email(
         template_name="activate_account.html",
         context={
-            "app_name": app_name,
             "username": email_to,
             "link": link,
         }
     )
     return EmailData(
         html_content=html_content,
-        subject=subject,
+        subject=RESET_PASSWORD_SUBJECT,
     )
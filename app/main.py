@@ -1,30 +1,66 @@
+import os
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
+from fastapi.staticfiles import StaticFiles
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from starlette.responses import JSONResponse
 
-from app.sсheduler import scheduler, run_generate_occur
+from app.sсheduler import scheduler, run_generate_occur, run_drain_outbox
 from app.api.v1 import api_router
 from app.exceptions import GiftAppError
 from app.core.config import get_settings
+from app.core.settings import precompile_mail_templates
+from app.core.database import async_session, engine, replica_engine
+from app.repositories.orm.media import MediaRepository
+from app.service.media import known_media_hashes, variant_executor
+from app.utils.media import media_executor
+from app.utils.security import password_executor
 
 settings = get_settings()
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
+    print(f"Precompiled mail templates: {precompile_mail_templates()}")
+    try:
+        async with async_session() as db:
+            print(f"Known media hashes loaded: {await known_media_hashes.warm(MediaRepository(db))}")
+    except Exception as e:
+        # uploads keep probing the database until the filter is warm
+        print(f"Known media hashes not loaded: {e}")
     print("Starting APScheduler...")
-    scheduler.add_job(
-        run_generate_occur,
-        CronTrigger(hour=0, minute=0),
-        id='generate_missing_occurrences',
-        replace_existing=True,
-    )
+    if settings.EVENT_OCCURRENCES_MATERIALIZE:
+        scheduler.add_job(
+            run_generate_occur,
+            CronTrigger(hour=0, minute=0),
+            id='generate_missing_occurrences',
+            replace_existing=True,
+        )
+        scheduler.add_job(
+            run_generate_occur,
+            kwargs={"catch_up": True},
+            id='catch_up_missing_occurrences',
+            replace_existing=True,
+        )
+    if settings.MAIL_BACKEND == "outbox":
+        scheduler.add_job(
+            run_drain_outbox,
+            IntervalTrigger(seconds=settings.MAIL_OUTBOX_POLL_SECONDS),
+            id='drain_mail_outbox',
+            replace_existing=True,
+        )
     scheduler.start()
     yield
     print("Shutdown APScheduler...")
     scheduler.shutdown(wait=False)
+    password_executor.shutdown()
+    media_executor.shutdown()
+    variant_executor.shutdown()
+    await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -39,6 +75,11 @@ async def app_exception_handler(_: Request, exc: GiftAppError):
 
 app.include_router(api_router)
 
+if settings.MEDIA_STORAGE_BACKEND == "local":
+    # served straight from disk; servers supporting the pathsend extension send files without copying
+    os.makedirs(settings.MEDIA_LOCAL_ROOT, exist_ok=True)
+    app.mount("/media", StaticFiles(directory=settings.MEDIA_LOCAL_ROOT), name="media")
+
 @app.get("/")
 async def root():
     return {"message": "Welcome!", "app_name": settings.APP_NAME}
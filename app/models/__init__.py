@@ -2,4 +2,5 @@ from .auth import User, SimpleUser, AdminUser, RootUser
 from .event import Event, EventOccurrence
 from .recipient import Recipient
 from .idea import GiftIdea
-from .media import MediaFile
+from .media import MediaFile, MediaVariant
+from .mail import OutboxMail
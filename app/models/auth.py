@@ -19,6 +19,7 @@ class User(SurrogatePKMixin, TimestampMixin, Base):
     __tablename__ = "users"
     __mapper_args__ = {
         "polymorphic_on": "role",
+        "eager_defaults": True,
     }
 
     username: Mapped[str] = mapped_column(String, unique=True, nullable=False)
@@ -59,6 +60,7 @@ class User(SurrogatePKMixin, TimestampMixin, Base):
 class SimpleUser(User):
     __mapper_args__ = {
         "polymorphic_identity": UserRole.USER.value,
+        "eager_defaults": True,
     }
 
     recipients: Mapped[List["Recipient"]] = relationship(
@@ -70,10 +72,12 @@ class SimpleUser(User):
 class AdminUser(User):
     __mapper_args__ = {
         "polymorphic_identity": UserRole.ADMIN.value,
+        "eager_defaults": True,
     }
 
 
 class RootUser(AdminUser):
     __mapper_args__ = {
         "polymorphic_identity": UserRole.ROOT.value,
+        "eager_defaults": True,
     }
\ No newline at end of file
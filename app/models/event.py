@@ -2,7 +2,7 @@ from typing import TYPE_CHECKING, List, Optional
 from datetime import date
 from uuid import UUID
 
-from sqlalchemy import String, Date, ForeignKey, CheckConstraint, Boolean
+from sqlalchemy import String, Date, ForeignKey, CheckConstraint, Boolean, Index, false, text
 from sqlalchemy.orm import Mapped, mapped_column, validates, relationship
 
 from app.core.models.base import Base
@@ -21,6 +21,16 @@ class Event(SurrogatePKMixin, TimestampMixin, SoftDeleteMixin, Base):
             "(NOT is_global) OR (recipient_id IS NULL)",
             name="global_recipient_null",
         ),
+        # deleted_at is part of the key (not only a partial predicate) so that SQLite can still
+        # combine both indexes for "user_id = ? OR is_global" visibility checks
+        Index(
+            "ix_events_user_id_active", "user_id", "deleted_at",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_events_is_global_active", "is_global", "deleted_at",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
     )
 
     title: Mapped[str] = mapped_column(String(32), nullable=False)
@@ -28,6 +38,7 @@ class Event(SurrogatePKMixin, TimestampMixin, SoftDeleteMixin, Base):
     is_global: Mapped[bool] = mapped_column(Boolean, nullable=False)
     is_repeating: Mapped[bool] = mapped_column(Boolean, nullable=False)
     start_date: Mapped[date] = mapped_column(Date, nullable=False)
+    next_due_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True, index=True)
 
     user_id: Mapped[UUID] = mapped_column(GUID, ForeignKey("users.id"), nullable=True)
     recipient_id: Mapped[UUID] = mapped_column(GUID, ForeignKey("recipients.id"), nullable=True)
@@ -66,8 +77,14 @@ class Event(SurrogatePKMixin, TimestampMixin, SoftDeleteMixin, Base):
 
 class EventOccurrence(SurrogatePKMixin, TimestampMixin, Base):
     __tablename__ = "event_occurrences"
+    __table_args__ = (
+        Index("ix_event_occurrences_event_id_occurrence_date", "event_id", "occurrence_date"),
+        Index("ix_event_occurrences_event_id_original_date", "event_id", "original_date"),
+    )
 
     occurrence_date: Mapped[date] = mapped_column(Date, nullable=False)
+    original_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+    is_cancelled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
 
     event_id: Mapped[UUID] = mapped_column(GUID, ForeignKey("events.id"), nullable=False)
 
@@ -3,7 +3,7 @@ from uuid import UUID
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import ForeignKey, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import String, Boolean, Numeric, JSON, TIMESTAMP
 from sqlalchemy.ext.mutable import MutableList
@@ -11,6 +11,7 @@ from sqlalchemy.ext.hybrid import hybrid_property
 
 from app.core.models.base import Base
 from app.core.models.mixins import GUID, SurrogatePKMixin, TimestampMixin, SoftDeleteMixin
+from app.core.models.search import SearchIndex
 
 if TYPE_CHECKING:
     from .auth import User
@@ -18,6 +19,18 @@ if TYPE_CHECKING:
 
 class GiftIdea(SurrogatePKMixin, TimestampMixin, SoftDeleteMixin, Base):
     __tablename__ = "gift_ideas"
+    __table_args__ = (
+        Index(
+            "ix_gift_ideas_user_id_active", "user_id", "archived_at",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_gift_ideas_is_global_active", "is_global", "archived_at",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+    )
 
     title: Mapped[str] = mapped_column(String(64), nullable=False)
     tags: Mapped[Optional[List[str]]] = mapped_column(MutableList.as_mutable(JSON), nullable=True)
@@ -43,4 +56,7 @@ class GiftIdea(SurrogatePKMixin, TimestampMixin, SoftDeleteMixin, Base):
     user: Mapped["User"] = relationship(
         "User",
         back_populates="ideas",
-    )
\ No newline at end of file
+    )
+
+
+idea_search = SearchIndex(GiftIdea.__table__, ("title", "description"))
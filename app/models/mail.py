@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from sqlalchemy import String, Text, Integer, Index, TIMESTAMP, func
+from sqlalchemy.orm import mapped_column, Mapped
+
+from app.core.enums import MailStatus
+from app.core.models.base import Base
+from app.core.models.mixins import SurrogatePKMixin, TimestampMixin
+
+
+class OutboxMail(SurrogatePKMixin, TimestampMixin, Base):
+    __tablename__ = "mail_outbox"
+    __table_args__ = (
+        Index("ix_mail_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    to_email: Mapped[str] = mapped_column(String(320), nullable=False)
+    subject: Mapped[str] = mapped_column(String(255), nullable=False)
+    html_content: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default=MailStatus.PENDING.value)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=False, server_default=func.now())
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    sent_at: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=True)
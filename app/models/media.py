@@ -1,9 +1,12 @@
-from sqlalchemy import String, Integer, Float
-from sqlalchemy.orm import mapped_column, Mapped, validates
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import String, Integer, Float, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import mapped_column, Mapped, validates, relationship
 
 from app.core.enums import MediaType
 from app.core.models.base import Base
-from app.core.models.mixins import SurrogatePKMixin, TimestampMixin
+from app.core.models.mixins import GUID, SurrogatePKMixin, TimestampMixin
 
 
 class MediaFile(SurrogatePKMixin, TimestampMixin, Base):
@@ -19,6 +22,13 @@ class MediaFile(SurrogatePKMixin, TimestampMixin, Base):
     height: Mapped[int] = mapped_column(Integer, nullable=False)
     ratio: Mapped[float] = mapped_column(Float, nullable=False)
 
+    variants: Mapped[List["MediaVariant"]] = relationship(
+        "MediaVariant",
+        back_populates="media",
+        cascade="all, delete-orphan",
+        order_by="MediaVariant.width",
+    )
+
     @validates("type")
     def validate_role(self, key, value):
         if isinstance(value, MediaType):
@@ -29,3 +39,24 @@ class MediaFile(SurrogatePKMixin, TimestampMixin, Base):
             return value
         else:
             raise TypeError(f"Type must be str or MediaType, got {type(value)}")
+
+
+
+class MediaVariant(SurrogatePKMixin, TimestampMixin, Base):
+    __tablename__ = "media_variants"
+    __table_args__ = (
+        UniqueConstraint("media_id", "width", "format"),
+    )
+
+    media_id: Mapped[UUID] = mapped_column(GUID, ForeignKey("media_files.id", ondelete="CASCADE"), nullable=False)
+    url: Mapped[str] = mapped_column(String, nullable=False)
+    format: Mapped[str] = mapped_column(String(16), nullable=False)
+    mime_type: Mapped[str] = mapped_column(String, nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    width: Mapped[int] = mapped_column(Integer, nullable=False)
+    height: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    media: Mapped["MediaFile"] = relationship(
+        "MediaFile",
+        back_populates="variants",
+    )
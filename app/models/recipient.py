@@ -9,6 +9,7 @@ from sqlalchemy.types import JSON
 
 from app.core.models.base import Base
 from app.core.models.mixins import GUID, SurrogatePKMixin
+from app.core.models.search import SearchIndex
 
 
 if TYPE_CHECKING:
@@ -25,7 +26,7 @@ class Recipient(SurrogatePKMixin, Base):
     preferences: Mapped[Optional[List[str]]] = mapped_column(MutableList.as_mutable(JSON), nullable=True)
     notes: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
-    user_id: Mapped[UUID] = mapped_column(GUID, ForeignKey("users.id"), nullable=False)
+    user_id: Mapped[UUID] = mapped_column(GUID, ForeignKey("users.id"), nullable=False, index=True)
 
     related_events: Mapped[List["Event"]] = relationship(
         "Event",
@@ -35,3 +36,6 @@ class Recipient(SurrogatePKMixin, Base):
         "SimpleUser",
         back_populates="recipients",
     )
+
+
+recipient_search = SearchIndex(Recipient.__table__, ("name", "relation", "notes"))
@@ -8,7 +8,7 @@ T = TypeVar("T")
 class AbstractRepository(ABC, Generic[T]):
         @abstractmethod
         async def add(self, entity: T) -> T:
-            """Add new entity to collection"""
+            """Add new entity to collection; it is stored when the unit of work commits"""
             ...
 
         @abstractmethod
@@ -28,9 +28,10 @@ class AbstractRepository(ABC, Generic[T]):
                 limit: int = 100,
                 order_by: Optional[str] = None,
                 desc_order: bool = False,
+                cursor: Optional[str] = None,
                 **filters: Any,
         ) -> List[T]:
-            """Get list of entities"""
+            """Get list of entities, starting after ``cursor`` when it is given instead of skipping rows"""
             ...
 
         @abstractmethod
@@ -39,8 +40,8 @@ class AbstractRepository(ABC, Generic[T]):
             ...
 
         @abstractmethod
-        async def count(self) -> int:
-            """Get general count of entities"""
+        async def count(self, **filters: Any) -> int:
+            """Get count of entities matching filters"""
             ...
 
         @abstractmethod
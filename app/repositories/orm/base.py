@@ -1,15 +1,34 @@
-from typing import TypeVar, Type, Any, Optional, List, Dict
+from datetime import datetime
+from typing import TypeVar, Type, Any, Optional, List, Dict, Iterable, Callable
 
-from sqlalchemy import select, func, desc, ColumnElement, Select
+from sqlalchemy import select, update, func, asc, desc, and_, or_, tuple_, literal, inspect, ColumnElement, Select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
 
+from app.core.database import after_commit
 from app.core.models.mixins import SurrogatePKMixin
+from app.core.models.search import SearchIndex
 from app.repositories.abstract.base import AbstractRepository
+from app.schemas.pagination import CountMode
+from app.utils.cursor import encode_cursor, decode_cursor
 
 
 U = TypeVar("U", bound=SurrogatePKMixin)
 
 
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
 class SQLAlchemyRepository(AbstractRepository[U]):
     def __init__(self, model: Type[U], session: AsyncSession):
         self._session = session
@@ -18,33 +37,49 @@ class SQLAlchemyRepository(AbstractRepository[U]):
     def _base_stmt(self) -> Select:
         return select(self._model)
 
+    # writes are flushed, not committed: the unit of work owning the session commits once
     async def add(self, entity: U) -> U:
         self._session.add(entity)
-        await self._session.commit()
-        await self._session.refresh(entity)
+        await self._session.flush()
+        await self._load_expired(entity)
         return entity
 
     async def update(self, entity: U, data: Dict[str, Any]) -> U:
         for field, value in data.items():
             setattr(entity, field, value)
-        await self._session.commit()
-        await self._session.refresh(entity)
+        await self._session.flush()
+        await self._load_expired(entity)
         return entity
 
+    async def add_many(self, entities: List[U]) -> List[U]:
+        # one batched INSERT ... RETURNING per flush
+        self._session.add_all(entities)
+        await self._session.flush()
+        return entities
+
+    async def update_many(self, changes: List[Dict[str, Any]]) -> None:
+        """
+        Update rows by primary key with executemany; every dict holds the row ``id`` and its new values.
+        Loaded entities are not updated, read them again with ``get_by_ids(..., reload=True)``.
+        """
+        if changes:
+            await self._session.execute(update(self._model), changes)
+
+    async def _load_expired(self, entity: U) -> None:
+        # attributes assigned SQL expressions (e.g. ``func.now()``) are expired by the flush
+        expired = inspect(entity).expired_attributes
+        if expired:
+            await self._session.refresh(entity, attribute_names=expired)
+
     async def delete(self, entity: U) -> None:
         await self._session.delete(entity)
-        await self._session.commit()
-        await self._session.refresh(entity)
-    async def list(
-            self,
-            skip: int = 0,
-            limit: int = 100,
-            order_by: Optional[str] = None,
-            desc_order: bool = False,
-            **filters: Any,
-        ) -> List[U]:
-        stmt = self._base_stmt()
+        await self._session.flush()
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` once the unit of work commits the changes made so far."""
+        after_commit(self._session, callback)
 
+    def _apply_filters(self, stmt: Select, filters: Dict[str, Any]) -> Select:
         for attr, value in filters.items():
             strict = True
             if "__icontains" in attr:
@@ -57,19 +92,67 @@ class SQLAlchemyRepository(AbstractRepository[U]):
                 stmt = stmt.where(column.in_(value))
             else:
                 stmt = stmt.where(column == value if strict else column.ilike(f"%{value}%"))
+        return stmt
+
+    def _sort_column(self, order_by: Optional[str]) -> Optional[ColumnElement]:
+        if not order_by:
+            return None
+        return getattr(self._model, order_by, None)
+
+    def _apply_ordering(self, stmt: Select, order_by: Optional[str], desc_order: bool) -> Select:
+        column = self._sort_column(order_by)
+        if column is not None:
+            stmt = stmt.order_by(desc(column).nulls_last() if desc_order else asc(column).nulls_last())
+        # id breaks ties, so that every sort order is total and can be resumed from a cursor
+        return stmt.order_by(desc(self._model.id) if desc_order else asc(self._model.id))
+
+    def _apply_cursor(self, stmt: Select, cursor: str, order_by: Optional[str], desc_order: bool) -> Select:
+        column = self._sort_column(order_by)
+        if column is None:
+            _, last_id = decode_cursor(cursor, order_by, desc_order, str)
+            return stmt.where(self._model.id < last_id if desc_order else self._model.id > last_id)
+
+        key, last_id = decode_cursor(cursor, order_by, desc_order, column.type.python_type)
+        if key is None:
+            # nulls are sorted last, so the rest of the page is the remaining nulls
+            id_after = self._model.id < last_id if desc_order else self._model.id > last_id
+            return stmt.where(and_(column.is_(None), id_after))
+
+        row, bound = tuple_(column, self._model.id), tuple_(self._cursor_key(key, column), literal(last_id, self._model.id.type))
+        after = row < bound if desc_order else row > bound
+        return stmt.where(or_(after, column.is_(None)))
+
+    def _cursor_key(self, key: Any, column: ColumnElement) -> ColumnElement:
+        if isinstance(key, datetime) and self._session.bind.dialect.name == "sqlite":
+            # SQLite compares timestamps as text: CURRENT_TIMESTAMP stores whole seconds, bound datetimes always
+            # carry microseconds, so the key has to be rendered the way the row stored it
+            timespec = "microseconds" if key.microsecond else "seconds"
+            return literal(key.isoformat(sep=" ", timespec=timespec))
+        return literal(key, column.type)
+
+    def make_cursor(self, entity: U, order_by: Optional[str] = None, desc_order: bool = False) -> str:
+        """Cursor pointing right after ``entity`` for the given sorting."""
+        key = getattr(entity, order_by) if self._sort_column(order_by) is not None else None
+        return encode_cursor(order_by, desc_order, key, entity.id)
 
-        if order_by:
-            column = getattr(self._model, order_by, None)
-            if column is not None:
-                if desc_order:
-                    stmt = stmt.order_by(desc(column))
-                else:
-                    stmt = stmt.order_by(column)
+    async def list(
+            self,
+            skip: int = 0,
+            limit: int = 100,
+            order_by: Optional[str] = None,
+            desc_order: bool = False,
+            cursor: Optional[str] = None,
+            **filters: Any,
+        ) -> List[U]:
+        stmt = self._apply_filters(self._base_stmt(), filters)
+        stmt = self._apply_ordering(stmt, order_by, desc_order)
 
+        if cursor:
+            stmt = self._apply_cursor(stmt, cursor, order_by, desc_order)
+        elif skip > 0:
+            stmt = stmt.offset(skip)
         if limit > 0:
             stmt = stmt.limit(limit)
-        if skip > 0:
-            stmt = stmt.offset(skip)
 
         result = await self._session.execute(stmt)
         return list(result.scalars().all())
@@ -79,13 +162,94 @@ class SQLAlchemyRepository(AbstractRepository[U]):
         result = await self._session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_by_ids(self, ids: Iterable[Any], reload: bool = False) -> Dict[Any, U]:
+        stmt = self._base_stmt().where(self._model.id.in_(set(ids)))
+        if reload:
+            stmt = stmt.execution_options(populate_existing=True)
+        result = await self._session.scalars(stmt)
+        return {entity.id: entity for entity in result}
+
     async def exists(self, _id: Any) -> bool:
         stmt = self._base_stmt().where(self._model.id == _id)
         result = await self._session.execute(stmt)
         return bool(result.first())
 
-    async def count(self) -> int:
-        base_sub = self._base_stmt().subquery()
-        stmt = select(func.count()).select_from(base_sub)
+    async def count(self, **filters: Any) -> int:
+        stmt = self._apply_filters(self._base_stmt(), filters)
+        stmt = stmt.with_only_columns(func.count(), maintain_column_froms=True)
+        result = await self._session.execute(stmt)
+        return result.scalar_one()
+
+    async def estimate_count(self, **filters: Any) -> int:
+        """
+        Row estimate of the planner for the filtered statement, read from ``EXPLAIN`` without executing it.
+        Falls back to an exact count on backends without planner statistics.
+        """
+        if self._session.bind.dialect.name != "postgresql":
+            return await self.count(**filters)
+
+        stmt = self._apply_filters(self._base_stmt(), filters)
+        result = await self._session.execute(_Explain(stmt))
+        plan = result.scalar_one()
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    async def list_page(
+            self,
+            skip: int = 0,
+            limit: int = 100,
+            order_by: Optional[str] = None,
+            desc_order: bool = False,
+            cursor: Optional[str] = None,
+            count_mode: CountMode = "none",
+            **filters: Any,
+    ) -> tuple[List[U], Optional[int]]:
+        """
+        Same as ``list``, additionally returning the number of rows matching ``filters`` when ``count_mode`` asks
+        for it. An exact total of an offset page is computed with ``COUNT(*) OVER()`` in the page query itself.
+        """
+        if count_mode == "none":
+            return await self.list(skip, limit, order_by, desc_order, cursor, **filters), None
+        if count_mode == "estimated":
+            items = await self.list(skip, limit, order_by, desc_order, cursor, **filters)
+            return items, await self.estimate_count(**filters)
+        if cursor:
+            # the window would only see the rows after the cursor
+            items = await self.list(skip, limit, order_by, desc_order, cursor, **filters)
+            return items, await self.count(**filters)
+
+        stmt = self._apply_filters(self._base_stmt(), filters)
+        stmt = self._apply_ordering(stmt, order_by, desc_order)
+        stmt = stmt.add_columns(func.count().over().label("total"))
+        if skip > 0:
+            stmt = stmt.offset(skip)
+        if limit > 0:
+            stmt = stmt.limit(limit)
+
+        rows = (await self._session.execute(stmt)).all()
+        if rows:
+            return [row[0] for row in rows], rows[0].total
+        # an empty page past the end carries no window value
+        return [], 0 if skip == 0 else await self.count(**filters)
+
+
+class SearchableRepositoryMixin:
+    """Ranked full-text ``search`` for repositories of a table with a ``search_index``."""
+    search_index: SearchIndex
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not isinstance(getattr(cls, "search_index", None), SearchIndex):
+            raise TypeError(f"{cls.__name__} is searchable but declares no search_index")
+
+    async def search(self, query: str, skip: int = 0, limit: int = 20, **filters: Any) -> List[U]:
+        """Rows matching the words of ``query`` and ``filters``, best match first."""
+        stmt = self._apply_filters(self._base_stmt(), filters)
+        stmt = self.search_index.apply(stmt, self._session.bind.dialect.name, query)
+        stmt = stmt.order_by(self._model.id)
+        if skip > 0:
+            stmt = stmt.offset(skip)
+        if limit > 0:
+            stmt = stmt.limit(limit)
+
         result = await self._session.execute(stmt)
-        return result.first()[0]
+        return list(result.scalars().all())
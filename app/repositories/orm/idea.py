@@ -1,20 +1,26 @@
 from uuid import UUID
-from typing import List, Any, Optional
+from typing import List, Any, Optional, Iterable
 
-from sqlalchemy import Select, select
+from sqlalchemy import Select, select, update, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.repositories.orm.base import SQLAlchemyRepository
-from app.models.idea import GiftIdea
+from app.repositories.orm.base import SQLAlchemyRepository, SearchableRepositoryMixin
+from app.models.idea import GiftIdea, idea_search
 
 
-class IdeaRepository(SQLAlchemyRepository[GiftIdea]):
+class IdeaRepository(SearchableRepositoryMixin, SQLAlchemyRepository[GiftIdea]):
+    search_index = idea_search
+
     def __init__(self, session: AsyncSession):
         super().__init__(GiftIdea, session)
 
     def _base_stmt(self) -> Select:
         return select(GiftIdea).where(GiftIdea.deleted_at == None)
 
+    async def soft_delete_many(self, ids: Iterable[UUID]) -> None:
+        stmt = update(GiftIdea).where(GiftIdea.id.in_(set(ids))).values(deleted_at=func.now())
+        await self._session.execute(stmt)
+
     async def get_by_user_id(
             self,
             user_id: UUID,
@@ -22,6 +28,7 @@ class IdeaRepository(SQLAlchemyRepository[GiftIdea]):
             limit: int = 100,
             order_by: Optional[str] = None,
             desc_order: bool = False,
+            cursor: Optional[str] = None,
             **filters: Any,
     ) -> List[GiftIdea]:
         return await self.list(
@@ -29,5 +36,6 @@ class IdeaRepository(SQLAlchemyRepository[GiftIdea]):
             limit=limit,
             order_by=order_by,
             desc_order=desc_order,
+            cursor=cursor,
             user_id=user_id, **filters
         )
\ No newline at end of file
@@ -1,23 +1,46 @@
-from typing import List
+from typing import List, Dict, Iterable, AsyncIterator, TypeVar
+from uuid import UUID
 
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories.orm.base import SQLAlchemyRepository
-from app.models.media import MediaFile
+from app.models.media import MediaFile, MediaVariant
 
+M = TypeVar("M", MediaFile, MediaVariant)
 
 class MediaRepository(SQLAlchemyRepository[MediaFile]):
     def __init__(self, session: AsyncSession):
         super().__init__(MediaFile, session)
 
-    async def add_many(self, media: List[MediaFile]) -> List[MediaFile]:
-        self._session.add_all(media)
-        await self._session.flush()
-        await self._session.commit()
+    async def add_many(self, media: List[M]) -> List[M]:
+        # in a savepoint: a conflict with a concurrent insert rolls back only these rows, not the unit of work
+        async with self._session.begin_nested():
+            self._session.add_all(media)
         return media
 
     async def get_by_hash(self, media_hash: str) -> MediaFile:
         stmt = select(self._model).where(self._model.hash == media_hash)
         result = await self._session.execute(stmt)
         return result.scalar_one_or_none()
+
+    async def get_by_hashes(self, hashes: Iterable[str], reload: bool = False) -> Dict[str, MediaFile]:
+        hashes = set(hashes)
+        if not hashes:
+            return {}
+        stmt = select(self._model).where(self._model.hash.in_(hashes)).options(selectinload(MediaFile.variants))
+        if reload:
+            stmt = stmt.execution_options(populate_existing=True)
+        result = await self._session.execute(stmt)
+        return {media.hash: media for media in result.scalars().all()}
+
+    async def get_variants(self, media_id: UUID) -> List[MediaVariant]:
+        stmt = select(MediaVariant).where(MediaVariant.media_id == media_id)
+        result = await self._session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def iter_hashes(self, chunk_size: int = 10000) -> AsyncIterator[str]:
+        stmt = select(self._model.hash).execution_options(yield_per=chunk_size)
+        async for media_hash in await self._session.stream_scalars(stmt):
+            yield media_hash
@@ -4,10 +4,13 @@ from typing import List, Optional, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Recipient
-from app.repositories.orm.base import SQLAlchemyRepository
+from app.models.recipient import recipient_search
+from app.repositories.orm.base import SQLAlchemyRepository, SearchableRepositoryMixin
 
 
-class RecipientRepository(SQLAlchemyRepository[Recipient]):
+class RecipientRepository(SearchableRepositoryMixin, SQLAlchemyRepository[Recipient]):
+    search_index = recipient_search
+
     def __init__(self, session: AsyncSession):
         super().__init__(Recipient, session)
 
@@ -18,6 +21,7 @@ class RecipientRepository(SQLAlchemyRepository[Recipient]):
             limit: int = 100,
             order_by: Optional[str] = None,
             desc_order: bool = False,
+            cursor: Optional[str] = None,
             **filters: Any,
     ) -> List[Recipient]:
         return await self.list(
@@ -25,5 +29,6 @@ class RecipientRepository(SQLAlchemyRepository[Recipient]):
             limit=limit,
             order_by=order_by,
             desc_order=desc_order,
+            cursor=cursor,
             user_id=user_id, **filters
         )
@@ -0,0 +1,11 @@
+from typing import List
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+MAX_BULK_ITEMS = 500
+
+
+class BulkIds(BaseModel):
+    ids: List[UUID] = Field(min_length=1, max_length=MAX_BULK_ITEMS)
@@ -33,6 +33,7 @@ class EventOccurrenceId(BaseModel):
     id: UUID
     occurrence_date: date
     created_at: datetime
+    is_cancelled: bool = False
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -49,6 +50,10 @@ class EventNext(EventModel):
     occurrence: Optional[EventOccurrenceId] = None
 
 
+class EventOccurrenceReschedule(BaseModel):
+    occurrence_date: date
+
+
 class EventUpdate(BaseModel):
     title: Optional[str] = None
     type: Optional[EventType] = None
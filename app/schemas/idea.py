@@ -37,4 +37,8 @@ class IdeaUpdateInfo(BaseModel):
     tags: Optional[List[str]] = Field(default=None)
     description: Optional[str] = None
     view_url: Optional[AnyUrl] = None
-    estimated_price: Optional[Decimal] = None
\ No newline at end of file
+    estimated_price: Optional[Decimal] = None
+
+
+class IdeaBulkUpdate(IdeaUpdateInfo):
+    id: UUID
\ No newline at end of file
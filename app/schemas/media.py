@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, List
 from uuid import UUID
 from datetime import datetime
 
@@ -17,6 +17,16 @@ class MediaFileMeta(BaseModel):
     hash: str
 
 
+class MediaVariantRead(BaseModel):
+    url: HttpUrl
+    format: str
+    mime_type: str
+    width: int
+    height: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class MediaFileBase(BaseModel):
     url: HttpUrl
     hash: str
@@ -25,6 +35,7 @@ class MediaFileBase(BaseModel):
     mime_type: str
     width: int
     height: int
+    variants: List[MediaVariantRead] = []
     created_at: datetime
     updated_at: Optional[datetime] = None
 
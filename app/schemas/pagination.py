@@ -0,0 +1,15 @@
+from typing import Generic, List, Literal, Optional, TypeVar
+
+from pydantic import BaseModel
+
+
+T = TypeVar("T")
+
+CountMode = Literal["none", "exact", "estimated"]
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_is_estimate: bool = False
@@ -4,16 +4,24 @@ from app.core.enums import TokenType
 from app.repositories.orm.user import UserRepository
 from app.schemas.user import UserModel
 from app.utils.security import (
-    verify_password, create_token
+    verify_password_async, create_token, VerifiedTokenCache, token_cache
 )
 from app.exceptions.common import NotFoundError
 from app.exceptions.auth import WrongCredentials, UserAlreadyActivated, UserIsNotActivated
 from app.schemas.auth import TokenPair
+from app.service.user import UserCache, user_cache
 
 
 class AuthService:
-    def __init__(self, repo: UserRepository):
+    def __init__(
+            self,
+            repo: UserRepository,
+            cache: UserCache = user_cache,
+            tokens: VerifiedTokenCache = token_cache,
+    ):
         self.repo = repo
+        self.cache = cache
+        self.tokens = tokens
 
     async def activate_user(self, user_id: UUID) -> UserModel:
         user = await self.repo.get_by_id(user_id)
@@ -24,15 +32,31 @@ class AuthService:
 
         user.is_active = True
         user = await self.repo.update(user, {})
+        self.repo.after_commit(lambda: self.cache.invalidate(user_id))
         return UserModel.model_validate(user)
 
+    async def deactivate_user(self, user_id: UUID) -> UserModel:
+        user = await self.repo.get_by_id(user_id)
+        if not user:
+            raise NotFoundError("User")
+
+        user.is_active = False
+        user = await self.repo.update(user, {})
+        self.repo.after_commit(lambda: self.logout(user_id))
+        return UserModel.model_validate(user)
+
+    def logout(self, user_id: UUID) -> None:
+        """Revoke the issued tokens of the user and drop its cached copy."""
+        self.tokens.revoke_user(user_id)
+        self.cache.invalidate(user_id)
+
     async def authenticate_user(self, email: str, password: str) -> UserModel:
         user = await self.repo.get_by_email(str(email))
         if not user:
             raise WrongCredentials()
         if not user.is_active:
             raise UserIsNotActivated(user.username)
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             raise WrongCredentials()
         return UserModel.model_validate(user)
 
@@ -6,7 +6,7 @@ from app.repositories.orm.user import UserRepository
 from app.models import SimpleUser, AdminUser
 from app.schemas.user import UserModel
 from app.utils.security import (
-    hash_password, create_token
+    hash_password_async, create_token
 )
 from app.exceptions.auth import EmailAlreadyTaken
 from app.schemas.auth import UserRegister
@@ -30,7 +30,7 @@ class UserRegistrationService:
         user = SimpleUser(
             email=str(user_data.email),
             username=user_data.username,
-            hashed_password=hash_password(user_data.password),
+            hashed_password=await hash_password_async(user_data.password),
             is_active=False,
         )
         await self.repo.add(user)
@@ -46,7 +46,7 @@ class UserRegistrationService:
             token=activation_token,
         )
 
-        self.mail_sender.send_mail(
+        await self.mail_sender.send_mail(
             to=str(user_model.email),
             subject=email_data.subject,
             html_content=email_data.html_content,
@@ -67,7 +67,7 @@ class AdminRegistrationService:
         user = AdminUser(
             email=str(user_data.email),
             username=user_data.username,
-            hashed_password=hash_password(user_data.password),
+            hashed_password=await hash_password_async(user_data.password),
             is_active=True,
         )
         await self.repo.add(user)
@@ -1,17 +1,18 @@
 from uuid import UUID
-from datetime import datetime, timezone, date
-from typing import Sequence
+from datetime import datetime, timezone, date, timedelta
+from collections import defaultdict
+from typing import Sequence, AsyncIterator, Literal, Optional, Dict, List, Set, Tuple, Callable
 
-from dateutil.relativedelta import relativedelta
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload, joinedload
-from sqlalchemy.sql import or_
+from sqlalchemy import select, insert, update, func, Select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql import and_, or_, ColumnElement
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Event, EventOccurrence, User, SimpleUser
 from app.exceptions.common import NotFoundError
 from app.exceptions.event import PastEventError
 from app.schemas.event import EventCreate, EventModel, EventUpdate
+from app.service.recurrence import Occurrence, expand_event, next_occurrence, is_event_date, dates_to_materialize
 
 
 async def event_create(data: EventCreate, user_id: UUID, db: AsyncSession) -> EventModel:
@@ -20,53 +21,114 @@ async def event_create(data: EventCreate, user_id: UUID, db: AsyncSession) -> Ev
         raise PastEventError(now.date())
 
     event = Event(**data.model_dump(), user_id=user_id)
+    if event.is_repeating:
+        event.next_due_date = event.start_date
     db.add(event)
     await db.flush()
 
-    event_occurrence = EventOccurrence(
-        occurrence_date=data.start_date,
-        event_id=event.id,
-    )
-    db.add(event_occurrence)
-    await db.commit()
-
     return EventModel.model_validate(event)
 
 
-async def generate_missing_occurrences(db: AsyncSession) -> int:
+ProgressCallback = Callable[[int, int, int], None]
+
+
+def _due_events_stmt(today: date, catch_up: bool, chunk_size: int) -> Select:
+    if catch_up:
+        # events without a watermark (created before it existed): derive it from the stored rows
+        last_date = func.max(func.coalesce(EventOccurrence.original_date, EventOccurrence.occurrence_date))
+        stmt = (select(Event.id, Event.start_date, last_date)
+                .outerjoin(EventOccurrence, EventOccurrence.event_id == Event.id)
+                .where(Event.next_due_date == None)
+                .group_by(Event.id, Event.start_date)
+                .order_by(Event.id))
+    else:
+        # the watermark leads the sort, so the chunk is read from its index instead of walking the primary key
+        stmt = (select(Event.id, Event.start_date, Event.next_due_date)
+                .where(Event.next_due_date <= today)
+                .order_by(Event.next_due_date, Event.id))
+
+    return (stmt
+            .where(Event.deleted_at == None)
+            .where(Event.is_repeating == True)
+            .limit(chunk_size))
+
+
+async def _stored_occurrence_keys(db: AsyncSession, candidates: Dict[UUID, List[date]]) -> Set[Tuple[UUID, date]]:
+    """
+    ``(event_id, date)`` of the stored rows standing for the candidate dates: a row stands for its ``original_date``,
+    or its own date when it has none, so cancelled and moved instances are not materialized again.
+    """
+    dates = [d for event_dates in candidates.values() for d in event_dates]
+    if not dates:
+        return set()
+    from_date, to_date = min(dates), max(dates)
+    stmt = (select(EventOccurrence.event_id, func.coalesce(EventOccurrence.original_date, EventOccurrence.occurrence_date))
+            .where(EventOccurrence.event_id.in_(list(candidates)))
+            .where(or_(
+                EventOccurrence.occurrence_date.between(from_date, to_date),
+                EventOccurrence.original_date.between(from_date, to_date),
+            )))
+    return {(event_id, key) for event_id, key in (await db.execute(stmt)).all()}
+
+
+async def generate_missing_occurrences(
+        db: AsyncSession,
+        chunk_size: int = 1000,
+        on_progress: Optional[ProgressCallback] = None,
+        catch_up: bool = False,
+) -> int:
+    """
+    Materialize missing occurrences of repeating events.
+
+    Every repeating event keeps a watermark, ``next_due_date``: the first day on which its stored rows no longer
+    reach today. A regular run only touches events whose watermark has passed, so days the job missed are picked
+    up by the next run. ``catch_up`` additionally processes events that have no watermark yet, deriving it from
+    their stored rows.
+
+    Due events are drained in chunks in a fixed order: a processed event's watermark moves past today (or is set,
+    in the catch-up pass), so it leaves the due predicate and the next chunk is the first page of the same indexed
+    query again. Missing dates are inserted with one bulk ``INSERT``, watermarks are moved with one bulk ``UPDATE``
+    and every chunk is committed on its own, so neither the transaction nor the identity map grows with the table.
+    ``on_progress`` is called after each chunk with the chunk number, the number of events scanned and the number of
+    rows created.
+    """
     today = date.today()
     created = 0
+    chunk = 0
 
-    stmt = (select(Event)
-            .where(Event.deleted_at == None)
-            .options(joinedload(Event.last_occurrence))
-            .where(Event.is_repeating == True))
-    result = await db.execute(stmt)
-    events = result.scalars().all()
+    passes = [False, True] if catch_up else [False]
+    for catch_up_pass in passes:
+        stmt = _due_events_stmt(today, catch_up_pass, chunk_size)
+
+        while True:
+            rows = (await db.execute(stmt)).all()
+            if not rows:
+                break
+
+            candidates = {}
+            watermarks = []
+            for event_id, start_date, mark in rows:
+                last = mark if catch_up_pass else mark - timedelta(days=1)
+                dates = dates_to_materialize(start_date, last, today)
+                candidates[event_id] = dates
+                watermarks.append({"id": event_id, "next_due_date": (dates[-1] if dates else last) + timedelta(days=1)})
+
+            stored = await _stored_occurrence_keys(db, candidates)
+            values = [
+                {"event_id": event_id, "occurrence_date": d}
+                for event_id, dates in candidates.items() for d in dates if (event_id, d) not in stored
+            ]
+
+            if values:
+                await db.execute(insert(EventOccurrence), values)
+            await db.execute(update(Event), watermarks)
+            await db.commit()
+
+            chunk += 1
+            created += len(values)
+            if on_progress:
+                on_progress(chunk, len(rows), len(values))
 
-    for event in events:
-        last_occ = event.last_occurrence
-        if not last_occ:
-            last_occ = EventOccurrence(
-                event_id=event.id,
-                occurrence_date=event.start_date,
-            )
-            db.add(last_occ)
-            created += 1
-
-        last_date = last_occ.occurrence_date
-
-        while last_date < today:
-            next_date = last_date + relativedelta(years=1)
-            last_occ = EventOccurrence(
-                event_id=event.id,
-                occurrence_date=next_date,
-            )
-            db.add(last_occ)
-            last_date = next_date
-            created += 1
-
-    await db.commit()
     return created
 
 
@@ -74,22 +136,29 @@ async def event_update_info(event: Event, data: EventUpdate, db: AsyncSession) -
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(event, key, value)
 
-    await db.commit()
+    await db.flush()
 
     return event
 
 
 async def event_delete(event: Event, db: AsyncSession):
     event.soft_delete()
-    await db.commit()
+    await db.flush()
+
+
+def _visible_events_clause(user: User) -> Optional[ColumnElement[bool]]:
+    if isinstance(user, SimpleUser):
+        return or_(Event.user_id == user.id, Event.is_global == True)
+    return None
 
 
 async def get_event(event_id: UUID, user: User, db: AsyncSession, with_occurrence: bool = False) -> Event:
     stmt = select(Event).where(Event.id == event_id).where(Event.deleted_at == None)
     if with_occurrence:
         stmt = stmt.options(selectinload(Event.occurrences))
-    if isinstance(user, SimpleUser):
-        stmt = stmt.where(or_(Event.user_id == user.id, Event.is_global))
+    visible = _visible_events_clause(user)
+    if visible is not None:
+        stmt = stmt.where(visible)
     result = await db.execute(stmt)
     event = result.scalar_one_or_none()
     if not event:
@@ -97,15 +166,67 @@ async def get_event(event_id: UUID, user: User, db: AsyncSession, with_occurrenc
     return event
 
 
-async def get_next_occurrence(event_id: UUID, db: AsyncSession) -> EventOccurrence:
+async def _load_exceptions(event: Event, from_date: date, db: AsyncSession) -> Sequence[EventOccurrence]:
+    stmt = (select(EventOccurrence)
+            .where(EventOccurrence.event_id == event.id)
+            .where(or_(EventOccurrence.occurrence_date >= from_date, EventOccurrence.original_date >= from_date)))
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
+
+async def get_next_occurrence(event: Event, db: AsyncSession) -> Optional[Occurrence]:
+    today = date.today()
+    exceptions = await _load_exceptions(event, today, db)
+    return next_occurrence(event, today, exceptions)
+
+
+async def _get_exception(event: Event, occurrence_date: date, db: AsyncSession) -> Optional[EventOccurrence]:
     stmt = (select(EventOccurrence)
-            .where(EventOccurrence.event_id == event_id)
-            .where(EventOccurrence.occurrence_date >= date.today())
-            .order_by(EventOccurrence.occurrence_date.asc())
-            .limit(1))
+            .where(EventOccurrence.event_id == event.id)
+            .where(or_(
+                EventOccurrence.original_date == occurrence_date,
+                (EventOccurrence.original_date == None) & (EventOccurrence.occurrence_date == occurrence_date),
+            )))
     result = await db.execute(stmt)
-    occurrence = result.scalar_one_or_none()
-    return occurrence
+    return result.scalars().first()
+
+
+async def _get_or_create_exception(event: Event, occurrence_date: date, db: AsyncSession) -> EventOccurrence:
+    exception = await _get_exception(event, occurrence_date, db)
+    if exception is None:
+        if not is_event_date(event, occurrence_date):
+            raise NotFoundError("Occurrence")
+        exception = EventOccurrence(
+            event_id=event.id,
+            occurrence_date=occurrence_date,
+            original_date=occurrence_date,
+        )
+        db.add(exception)
+    return exception
+
+
+async def occurrence_cancel(event: Event, occurrence_date: date, db: AsyncSession) -> None:
+    """Store a cancellation exception for a single instance of the event."""
+    exception = await _get_or_create_exception(event, occurrence_date, db)
+    exception.is_cancelled = True
+    await db.flush()
+
+
+async def occurrence_reschedule(event: Event, occurrence_date: date, new_date: date, db: AsyncSession) -> Occurrence:
+    """Move a single instance of the event to another date, keeping the rest of the series intact."""
+    exception = await _get_or_create_exception(event, occurrence_date, db)
+    if exception.original_date is None:
+        exception.original_date = exception.occurrence_date
+    exception.occurrence_date = new_date
+    exception.is_cancelled = False
+    await db.flush()
+
+    return Occurrence(
+        id=exception.id,
+        event_id=exception.event_id,
+        occurrence_date=exception.occurrence_date,
+        created_at=exception.created_at,
+    )
 
 
 async def get_event_list(user: User, db: AsyncSession, with_occurrence: bool = False) -> Sequence[Event]:
@@ -113,8 +234,73 @@ async def get_event_list(user: User, db: AsyncSession, with_occurrence: bool = F
             .where(Event.deleted_at == None))
     if with_occurrence:
         stmt = stmt.options(selectinload(Event.occurrences))
-    if isinstance(user, SimpleUser):
-        stmt = stmt.where(or_(Event.user_id == user.id, Event.is_global))
+    visible = _visible_events_clause(user)
+    if visible is not None:
+        stmt = stmt.where(visible)
     result = await db.execute(stmt)
     events = result.scalars().all()
-    return events
\ No newline at end of file
+    return events
+
+
+def _listed_events_clauses(user: User, event_id: Optional[UUID]) -> list:
+    clauses = [Event.deleted_at == None]
+    if event_id is not None:
+        clauses.append(Event.id == event_id)
+    visible = _visible_events_clause(user)
+    if visible is not None:
+        clauses.append(visible)
+    return clauses
+
+
+def _expanded_in_range_clause(from_date: date, to_date: date) -> ColumnElement[bool]:
+    return and_(Event.start_date <= to_date, or_(Event.is_repeating, Event.start_date >= from_date))
+
+
+async def iter_occurrences_in_range(
+        user: User,
+        db: AsyncSession,
+        from_date: date,
+        to_date: date,
+        group_by: Literal["date", "event"] = "date",
+        event_id: Optional[UUID] = None,
+) -> AsyncIterator[Occurrence]:
+    """
+    Yield occurrences of visible events whose date falls into ``[from_date, to_date]``.
+
+    Occurrences are expanded from ``Event.start_date`` and ``is_repeating`` by the recurrence engine; only
+    exceptions (moved or cancelled instances) are read from ``event_occurrences``, and only those inside the
+    window. Exceptions are selected by their dates alone, so an instance moved into the window is found even when
+    its event would expand nothing there. Occurrences come out ordered by ``group_by`` (by date, or by event and
+    then date), which lets callers group them in a single pass.
+    """
+    clauses = _listed_events_clauses(user, event_id)
+
+    exceptions_stmt = (select(EventOccurrence)
+                       .join(Event, EventOccurrence.event_id == Event.id)
+                       .where(*clauses)
+                       .where(or_(
+                           EventOccurrence.occurrence_date.between(from_date, to_date),
+                           EventOccurrence.original_date.between(from_date, to_date),
+                       )))
+    exceptions: Dict[UUID, List[EventOccurrence]] = defaultdict(list)
+    async for row in await db.stream_scalars(exceptions_stmt):
+        exceptions[row.event_id].append(row)
+
+    in_range = _expanded_in_range_clause(from_date, to_date)
+    if exceptions:
+        in_range = or_(in_range, Event.id.in_(list(exceptions)))
+    events_stmt = select(Event).where(*clauses, in_range).order_by(Event.id)
+    events = await db.stream_scalars(events_stmt)
+
+    if group_by == "event":
+        async for event in events:
+            for occurrence in expand_event(event, from_date, to_date, exceptions.get(event.id, ())):
+                yield occurrence
+        return
+
+    occurrences = []
+    async for event in events:
+        occurrences.extend(expand_event(event, from_date, to_date, exceptions.get(event.id, ())))
+    occurrences.sort(key=lambda occur: (occur.occurrence_date, occur.event_id))
+    for occurrence in occurrences:
+        yield occurrence
@@ -1,9 +1,10 @@
 from uuid import UUID
-from typing import Sequence, Optional
+from typing import Sequence, Optional, Iterable, List, Dict
 
 from app.repositories.orm import IdeaRepository
-from app.schemas.idea import IdeaCreate, IdeaUpdateInfo, IdeaModel
+from app.schemas.idea import IdeaCreate, IdeaUpdateInfo, IdeaModel, IdeaBulkUpdate
 from app.schemas.user import UserModel
+from app.schemas.pagination import Page, CountMode
 from app.exceptions.common import NotFoundError, PolicyPermissionError
 from app.service.idea.policy import IdeaPolicy
 from app.models import GiftIdea
@@ -33,12 +34,60 @@ class IdeaService:
         if not allowed:
             raise PolicyPermissionError(f"Forbidden to {action} idea")
 
+    def _check_batch_permission(
+            self,
+            user: UserModel,
+            action: str,
+            ideas: Iterable[GiftIdea] = (),
+            is_global: Iterable[bool] = (),
+    ):
+        """Same rules as ``_check_permission``, decided once for a whole batch."""
+        policy = self.policy_cls(user)
+        schemas = [IdeaModel.model_validate(idea) for idea in ideas]
+
+        match action:
+            case "create":
+                allowed = all(policy.can_create(value) for value in set(is_global))
+            case "edit":
+                allowed = policy.can_edit_all(schemas)
+            case "delete":
+                allowed = policy.can_delete_all(schemas)
+            case _:
+                raise ValueError(f"Unknown policy action: {action}")
+
+        if not allowed:
+            raise PolicyPermissionError(f"Forbidden to {action} ideas")
+
     async def create(self, user: UserModel, data: IdeaCreate) -> IdeaModel:
         self._check_permission(user, "create", is_global=data.is_global)
         idea = GiftIdea(**data.model_dump(mode="json"), user_id=user.id)
         await self.repo.add(idea)
         return IdeaModel.model_validate(idea)
 
+    async def create_many(self, user: UserModel, data: Sequence[IdeaCreate]) -> List[IdeaModel]:
+        self._check_batch_permission(user, "create", is_global=(item.is_global for item in data))
+        ideas = [GiftIdea(**item.model_dump(mode="json"), user_id=user.id) for item in data]
+        await self.repo.add_many(ideas)
+        return [IdeaModel.model_validate(idea) for idea in ideas]
+
+    async def update_many(self, user: UserModel, data: Sequence[IdeaBulkUpdate]) -> List[IdeaModel]:
+        """Apply changes to many ideas at once; changes of an id listed twice are merged in order."""
+        changes: Dict[UUID, dict] = {}
+        for item in data:
+            changes.setdefault(item.id, {}).update(item.model_dump(mode="json", exclude_unset=True, exclude={"id"}))
+
+        ideas = await self._get_models(changes)
+        self._check_batch_permission(user, "edit", ideas.values())
+        await self.repo.update_many([{"id": idea_id, **values} for idea_id, values in changes.items() if values])
+
+        updated = await self.repo.get_by_ids(changes, reload=True)
+        return [IdeaModel.model_validate(updated[idea_id]) for idea_id in changes]
+
+    async def soft_delete_many(self, user: UserModel, ids: Sequence[UUID]):
+        ideas = await self._get_models(ids)
+        self._check_batch_permission(user, "delete", ideas.values())
+        await self.repo.soft_delete_many(ideas)
+
     async def update_info(self, user: UserModel, idea_id: UUID, data: IdeaUpdateInfo) -> IdeaModel:
         idea = await self._get_model(idea_id)
         self._check_permission(user, "edit", idea)
@@ -58,6 +107,25 @@ class IdeaService:
         updated = await self.repo.update(idea, {})
         return IdeaModel.model_validate(updated)
 
+    def _to_page(
+            self,
+            ideas: Sequence[GiftIdea],
+            total: Optional[int],
+            limit: int,
+            order_by: Optional[str],
+            desc_order: bool,
+            count_mode: CountMode,
+    ) -> Page[IdeaModel]:
+        next_cursor = None
+        if ideas and len(ideas) == limit:
+            next_cursor = self.repo.make_cursor(ideas[-1], order_by, desc_order)
+        return Page[IdeaModel](
+            items=[IdeaModel.model_validate(i) for i in ideas],
+            next_cursor=next_cursor,
+            total=total,
+            total_is_estimate=count_mode == "estimated",
+        )
+
     async def get_user_ideas(
             self,
             user: UserModel,
@@ -65,17 +133,21 @@ class IdeaService:
             offset: int = 0,
             order_by: Optional[str] = None,
             desc_order: bool = False,
-            filters: dict = None
-    ) -> Sequence[IdeaModel]:
-        ideas = await self.repo.get_by_user_id(
-            user.id,
+            filters: dict = None,
+            cursor: Optional[str] = None,
+            count_mode: CountMode = "none",
+    ) -> Page[IdeaModel]:
+        ideas, total = await self.repo.list_page(
             offset,
             limit,
             order_by,
             desc_order,
+            cursor,
+            count_mode,
+            user_id=user.id,
             **filters,
         )
-        return [IdeaModel.model_validate(i) for i in ideas]
+        return self._to_page(ideas, total, limit, order_by, desc_order, count_mode)
 
     async def get_global_ideas(
             self,
@@ -83,17 +155,35 @@ class IdeaService:
             offset: int = 0,
             order_by: Optional[str] = None,
             desc_order: bool = False,
-            filters: dict = None
-    ) -> Sequence[IdeaModel]:
-        ideas = await self.repo.list(
+            filters: dict = None,
+            cursor: Optional[str] = None,
+            count_mode: CountMode = "none",
+    ) -> Page[IdeaModel]:
+        ideas, total = await self.repo.list_page(
             offset,
             limit,
             order_by,
             desc_order,
+            cursor,
+            count_mode,
             is_global=True,
             **filters,
         )
-        return [IdeaModel.model_validate(i) for i in ideas]
+        return self._to_page(ideas, total, limit, order_by, desc_order, count_mode)
+
+    async def search(
+            self,
+            user: UserModel,
+            query: str,
+            scope: str = "my",
+            limit: int = 20,
+            offset: int = 0,
+            archived: bool = False,
+    ) -> List[IdeaModel]:
+        """Ideas of the user (``my``) or global ideas (``global``) matching ``query``, best match first."""
+        owner = {"user_id": user.id} if scope == "my" else {"is_global": True}
+        ideas = await self.repo.search(query, offset, limit, is_archived=archived, **owner)
+        return [IdeaModel.model_validate(idea) for idea in ideas]
 
     async def get_one(self, user: UserModel, idea_id: UUID) -> IdeaModel:
         idea = await self._get_model(idea_id)
@@ -105,3 +195,10 @@ class IdeaService:
         if not idea:
             raise NotFoundError("Idea")
         return idea
+
+    async def _get_models(self, ids: Iterable[UUID]) -> Dict[UUID, GiftIdea]:
+        ids = set(ids)
+        ideas = await self.repo.get_by_ids(ids)
+        if len(ideas) != len(ids):
+            raise NotFoundError("Idea")
+        return ideas
@@ -1,3 +1,5 @@
+from typing import Iterable
+
 from app.core.enums import UserRole
 from app.schemas.user import UserModel
 from app.schemas.idea import IdeaModel
@@ -27,4 +29,10 @@ class IdeaPolicy:
         return self._is_its(idea) or self._is_admin()
 
     def can_delete(self, idea: IdeaModel):
-        return self._is_its(idea) or self._is_admin()
\ No newline at end of file
+        return self._is_its(idea) or self._is_admin()
+
+    def can_edit_all(self, ideas: Iterable[IdeaModel]):
+        return self._is_admin() or all(self._is_its(idea) for idea in ideas)
+
+    def can_delete_all(self, ideas: Iterable[IdeaModel]):
+        return self._is_admin() or all(self._is_its(idea) for idea in ideas)
\ No newline at end of file
@@ -1,2 +1,4 @@
 from .uploader import MediaUploaderService
-from .validator import AvaMediaValidator, ContentMediaValidator
\ No newline at end of file
+from .validator import AvaMediaValidator, ContentMediaValidator
+from .known_hashes import KnownMediaHashes, known_media_hashes
+from .variants import MediaVariantService, variant_executor
@@ -0,0 +1,36 @@
+from app.core.config import get_settings
+from app.repositories.orm.media import MediaRepository
+from app.utils.bloom import BloomFilter
+
+settings = get_settings()
+
+
+class KnownMediaHashes:
+    """
+    Bloom filter of the hashes of stored media; until the filter is warmed every hash counts as possibly known.
+
+    The filter lives in each process and only learns the hashes this process stores after warming, so with several
+    workers a miss is a hint that lets the dedup lookup be skipped, not a guarantee that the file is new: the insert
+    of the uploader stays safe against a conflicting row of another worker.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self._filter = BloomFilter(capacity, error_rate)
+        self.ready = False
+
+    def might_exist(self, media_hash: str) -> bool:
+        return not self.ready or media_hash in self._filter
+
+    def add(self, media_hash: str) -> None:
+        self._filter.add(media_hash)
+
+    async def warm(self, repo: MediaRepository) -> int:
+        count = 0
+        async for media_hash in repo.iter_hashes():
+            self.add(media_hash)
+            count += 1
+        self.ready = True
+        return count
+
+
+known_media_hashes = KnownMediaHashes(settings.MEDIA_KNOWN_HASHES_CAPACITY)
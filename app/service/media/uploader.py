@@ -1,16 +1,21 @@
-from typing import List
+from typing import List, Dict, Set, Tuple, Iterable, Optional, BinaryIO, Callable
 import os
 import base64
+import asyncio
 
 from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
 
+from app.core.config import get_settings
 from app.storage import MediaStorage
 from app.schemas.media import MediaFileMeta, MediaFileModel
 from app.service.media.validator import BaseMediaValidator
 from app.models import MediaFile
 from app.core.enums import MediaType
 from app.repositories.orm.media import MediaRepository
+from app.service.media.known_hashes import KnownMediaHashes, known_media_hashes
 
+settings = get_settings()
 
 class MediaUploaderService:
     """
@@ -28,11 +33,28 @@ class MediaUploaderService:
     :type storage: MediaStorage
     :ivar validator: Validator instance to verify media data before upload.
     :type validator: BaseMediaValidator
+    :ivar max_parallel: Maximum number of storage calls running at once for one request.
+    :type max_parallel: int
+    :ivar known_hashes: Filter of stored hashes that lets new files skip the dedup lookup.
+    :type known_hashes: KnownMediaHashes
+    :ivar on_created: Called with every newly stored media file and its storage path, e.g. to schedule variants.
+    :type on_created: Optional[Callable[[MediaFile, str], None]]
     """
-    def __init__(self, repo: MediaRepository, storage: MediaStorage, validator: BaseMediaValidator):
+    def __init__(
+            self,
+            repo: MediaRepository,
+            storage: MediaStorage,
+            validator: BaseMediaValidator,
+            max_parallel: int = settings.MEDIA_UPLOAD_CONCURRENCY,
+            known_hashes: KnownMediaHashes = known_media_hashes,
+            on_created: Optional[Callable[[MediaFile, str], None]] = None,
+    ):
         self.repo = repo
         self.storage = storage
         self.validator = validator
+        self.max_parallel = max_parallel
+        self.known_hashes = known_hashes
+        self.on_created = on_created
 
     @staticmethod
     def _build_upload_path(media_data: MediaFileMeta, _type: MediaType) -> str:
@@ -45,66 +67,150 @@ class MediaUploaderService:
         return MediaFile(
             url=url,
             hash=media_data.hash,
-            type=MediaType.AVATAR.value,
+            type=_type.value,
             alt=media_data.filename,
             mime_type=media_data.mime_type,
             size=media_data.size_bytes,
             width=media_data.width,
             height=media_data.height,
             ratio=media_data.ratio,
+            variants=[],
         )
 
-    async def upload_one(
-            self,
-            file_bytes: bytes,
-            media_data: MediaFileMeta,
-            _type: MediaType
-    ) -> MediaFileModel:
-        self.validator.validate(media_data)
+    def _is_reusable(self, media: Optional[MediaFile], _type: MediaType) -> bool:
+        return media is not None and media.type == _type.value
 
-        existing_media = await self.repo.get_by_hash(media_data.hash)
-        if existing_media and existing_media.type == _type.value:
-            return MediaFileModel.model_validate(existing_media)
+    async def _find_existing(self, hashes: Iterable[str]) -> Dict[str, MediaFile]:
+        return await self.repo.get_by_hashes(h for h in hashes if self.known_hashes.might_exist(h))
 
-        upload_path = self._build_upload_path(media_data, _type)
+    async def _find_lost_objects(self, media: Iterable[MediaFile]) -> Dict[str, str]:
+        """Storage paths, by hash, of stored rows whose object is missing from the storage."""
+        paths = {}
+        for m in media:
+            path = self.storage.path_from_url(m.url)
+            if path is not None:
+                paths[path] = m.hash
+        semaphore = asyncio.Semaphore(self.max_parallel)
 
-        url = await run_in_threadpool(self.storage.upload, file_bytes, upload_path, media_data.mime_type)
+        async def exists(path: str) -> bool:
+            # answered from the HEAD cache of the storage for files checked recently
+            async with semaphore:
+                return await run_in_threadpool(self.storage.exists, path)
 
-        media = self._create_media_model(url, media_data, _type)
-        await self.repo.add(media)
+        present = await asyncio.gather(*(exists(path) for path in paths))
+        return {media_hash: path for (path, media_hash), found in zip(paths.items(), present) if not found}
 
-        return MediaFileModel.model_validate(media)
+    async def _persist(
+            self,
+            media: List[MediaFile],
+            existing: Dict[str, MediaFile],
+            hashes: Set[str],
+            _type: MediaType,
+    ) -> Tuple[List[MediaFile], Dict[str, MediaFile]]:
+        """
+        Insert the rows of new files, returning them with the stored rows of the requested ``hashes``.
+
+        The known-hash filter misses the hashes other workers stored since it was warmed, so a file taken for new
+        may conflict with a concurrent insert. Only the savepoint of the insert is rolled back then: the rows of all
+        requested hashes are read again and the files still missing are inserted next to the rows of the other worker.
+        """
+        try:
+            return await self.repo.add_many(media), existing
+        except IntegrityError:
+            stored = await self.repo.get_by_hashes(hashes, reload=True)
+            missing = [m for m in media if not self._is_reusable(stored.get(m.hash), _type)]
+            if len(missing) == len(media):
+                raise
+        created = await self.repo.add_many(missing) if missing else []
+        return created, stored
+
+    async def upload_one(
+            self,
+            file: BinaryIO,
+            media_data: MediaFileMeta,
+            _type: MediaType
+    ) -> MediaFileModel:
+        [media] = await self.upload_many([file], [media_data], _type)
+        return media
 
     async def upload_many(
             self,
-            files: List[bytes],
+            files: List[BinaryIO],
             datas: List[MediaFileMeta],
             _type: MediaType
     ) -> List[MediaFileModel]:
-        results: List[MediaFile] = []
-        uploaded_paths: List[str] = []
-
         for media_data in datas:
             self.validator.validate(media_data)
 
-        try:
-            for file_bytes, media_data in zip(files, datas):
-                existing_media = await self.repo.get_by_hash(media_data.hash)
-                if existing_media and existing_media.type == _type.value:
-                    results.append(existing_media)
-                    continue
-
-                upload_path = self._build_upload_path(media_data, _type)
-                uploaded_paths.append(upload_path)
-
-                url = await run_in_threadpool(self.storage.upload, file_bytes, upload_path, media_data.mime_type)
-
-                media = self._create_media_model(url, media_data, _type)
-                results.append(media)
+        existing = await self._find_existing(media_data.hash for media_data in datas)
+        lost = await self._find_lost_objects(m for m in existing.values() if self._is_reusable(m, _type))
+        pending: Dict[str, Tuple[BinaryIO, MediaFileMeta]] = {}
+        restored: Dict[str, Tuple[BinaryIO, MediaFileMeta]] = {}
+        for file, media_data in zip(files, datas):
+            if not self._is_reusable(existing.get(media_data.hash), _type):
+                pending.setdefault(media_data.hash, (file, media_data))
+            elif media_data.hash in lost:
+                restored.setdefault(lost[media_data.hash], (file, media_data))
+
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        uploaded_paths: Dict[str, str] = {}
+
+        async def upload(file: BinaryIO, media_data: MediaFileMeta) -> MediaFile:
+            upload_path = self._build_upload_path(media_data, _type)
+            async with semaphore:
+                url = await run_in_threadpool(self.storage.upload, file, upload_path, media_data.mime_type)
+            uploaded_paths[upload_path] = media_data.hash
+            return self._create_media_model(url, media_data, _type)
+
+        async def restore(path: str, file: BinaryIO, media_data: MediaFileMeta) -> None:
+            # the row is kept, only the object behind it is put back
+            async with semaphore:
+                await run_in_threadpool(self.storage.upload, file, path, media_data.mime_type)
 
-            results = await self.repo.add_many(results)
-            return [MediaFileModel.model_validate(media) for media in results]
-        except Exception as e:
-            for path in uploaded_paths:
+        try:
+            # let every upload settle before failing, so that compensation sees all stored objects
+            results = await asyncio.gather(
+                *(upload(*item) for item in pending.values()),
+                *(restore(path, *item) for path, item in restored.items()),
+                return_exceptions=True,
+            )
+            errors = [result for result in results if isinstance(result, BaseException)]
+            if errors:
+                raise errors[0]
+            uploaded = results[:len(pending)]
+            created, existing = await self._persist(
+                list(uploaded), existing, {media_data.hash for media_data in datas}, _type
+            )
+        except Exception:
+            await self._discard_uploads(uploaded_paths, _type)
+            raise
+
+        for media_hash in existing.keys() | {media.hash for media in created}:
+            self.known_hashes.add(media_hash)
+        if self.on_created:
+            paths = {media_hash: path for path, media_hash in uploaded_paths.items()}
+            uploaded_ids = {id(media) for media in uploaded}
+            for media in created:
+                if id(media) in uploaded_ids:
+                    self.on_created(media, paths[media.hash])
+        by_hash = {**existing, **{media.hash: media for media in created}}
+        return [MediaFileModel.model_validate(by_hash[media_data.hash]) for media_data in datas]
+
+    async def _discard_uploads(self, uploaded_paths: Dict[str, str], _type: MediaType) -> None:
+        # only the storage is compensated, the transaction is left to the unit of work;
+        # paths are content-addressed, so an object may already back a row stored by a concurrent upload
+        referenced = await self.repo.get_by_hashes(uploaded_paths.values())
+        await self._delete_many([
+            path for path, media_hash in uploaded_paths.items()
+            if not self._is_reusable(referenced.get(media_hash), _type)
+        ])
+
+    async def _delete_many(self, paths: List[str]) -> None:
+        semaphore = asyncio.Semaphore(self.max_parallel)
+
+        async def delete(path: str) -> None:
+            async with semaphore:
                 await run_in_threadpool(self.storage.delete, path)
-            raise e
+
+        # best effort: a failed delete must not hide the error that failed the upload
+        await asyncio.gather(*(delete(path) for path in paths), return_exceptions=True)
@@ -0,0 +1,114 @@
+import os
+import mmap
+from io import BytesIO
+from dataclasses import dataclass
+from typing import List, Sequence, Union, BinaryIO
+from uuid import UUID
+
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image, ImageOps, features
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import get_settings
+from app.models import MediaVariant
+from app.repositories.orm.media import MediaRepository
+from app.storage import MediaStorage
+from app.utils.concurrency import BoundedExecutor
+
+settings = get_settings()
+
+VARIANT_MIME_TYPES = {"webp": "image/webp", "avif": "image/avif"}
+
+variant_executor = BoundedExecutor(max_workers=settings.MEDIA_VARIANT_WORKERS, name="Media variants")
+
+
+@dataclass(frozen=True)
+class RenderedVariant:
+    format: str
+    width: int
+    height: int
+    content: bytes
+
+    @property
+    def mime_type(self) -> str:
+        return VARIANT_MIME_TYPES[self.format]
+
+
+def variant_path(source_path: str, width: int, fmt: str) -> str:
+    stem, _ = os.path.splitext(source_path)
+    return f"{stem}/{width}w.{fmt}"
+
+
+def render_variants(source: Union[bytes, BinaryIO], widths: Sequence[int], formats: Sequence[str]) -> List[RenderedVariant]:
+    """Downscale ``source`` to every width smaller than the original and encode it in every supported format."""
+    formats = [fmt for fmt in formats if fmt in VARIANT_MIME_TYPES and features.check(fmt)]
+    result = []
+    # memory-mapped sources are read in place
+    with Image.open(BytesIO(source) if isinstance(source, bytes) else source) as image:
+        # variants carry no EXIF, so camera rotation has to be applied to the pixels before sizing
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        for width in sorted(set(widths)):
+            if width >= image.width:
+                continue
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+            for fmt in formats:
+                buffer = BytesIO()
+                resized.save(buffer, format=fmt.upper(), quality=80)
+                result.append(RenderedVariant(format=fmt, width=width, height=height, content=buffer.getvalue()))
+    return result
+
+
+class MediaVariantService:
+    def __init__(
+            self,
+            repo: MediaRepository,
+            storage: MediaStorage,
+            widths: Sequence[int] = tuple(settings.MEDIA_VARIANT_WIDTHS),
+            formats: Sequence[str] = tuple(settings.MEDIA_VARIANT_FORMATS),
+    ):
+        self.repo = repo
+        self.storage = storage
+        self.widths = widths
+        self.formats = formats
+
+    async def generate(self, media_id: UUID, source_path: str) -> List[MediaVariant]:
+        """
+        Render the configured variants of a stored file that are not recorded yet, upload them next to it and
+        record them. Returns the variants recorded by this call.
+        """
+        stored = {(v.width, v.format) for v in await self.repo.get_variants(media_id)}
+        widths = [w for w in self.widths if any((w, fmt) not in stored for fmt in self.formats)]
+        if not widths:
+            return []
+
+        source = await run_in_threadpool(self.storage.read, source_path)
+        try:
+            rendered = await variant_executor.run(render_variants, source, widths, self.formats)
+        finally:
+            # a memory map keeps the file mapped until it is closed
+            if isinstance(source, mmap.mmap):
+                source.close()
+
+        variants = []
+        for item in rendered:
+            if (item.width, item.format) in stored:
+                continue
+            path = variant_path(source_path, item.width, item.format)
+            url = await run_in_threadpool(self.storage.upload, item.content, path, item.mime_type)
+            variants.append(MediaVariant(
+                media_id=media_id,
+                url=url,
+                format=item.format,
+                mime_type=item.mime_type,
+                size=len(item.content),
+                width=item.width,
+                height=item.height,
+            ))
+        try:
+            return await self.repo.add_many(variants)
+        except IntegrityError:
+            # recorded by a concurrent run in the meantime; the uploaded objects are the same content-addressed files
+            return []
@@ -1,5 +1,5 @@
 from uuid import UUID
-from typing import Sequence, Optional
+from typing import Sequence, Optional, List
 
 from app.service.recipient.policy import RecipientPolicy
 from app.repositories.orm.recipient import RecipientRepository
@@ -7,6 +7,7 @@ from app.models import Recipient
 from app.exceptions.common import NotFoundError, PolicyPermissionError
 from app.schemas.recipient import RecipientCreate, RecipientUpdateInfo, RecipientUpdateBirthday, RecipientModel
 from app.schemas.user import UserModel
+from app.schemas.pagination import Page, CountMode
 
 
 class RecipientService:
@@ -39,6 +40,13 @@ class RecipientService:
         await self.repo.add(recipient)
         return RecipientModel.model_validate(recipient)
 
+    async def create_many(self, user: UserModel, data: Sequence[RecipientCreate]) -> List[RecipientModel]:
+        # the create rule does not depend on the recipient, so one check covers the batch
+        await self._check_permission(user, "create")
+        recipients = [Recipient(**item.model_dump(), user_id=user.id) for item in data]
+        await self.repo.add_many(recipients)
+        return [RecipientModel.model_validate(recipient) for recipient in recipients]
+
     async def update_info(self, recipient_id: UUID, user: UserModel, data: RecipientUpdateInfo) -> RecipientModel:
         recipient = await self._get_model(recipient_id)
         await self._check_permission(user, "edit", recipient)
@@ -73,17 +81,34 @@ class RecipientService:
             offset: int = 0,
             order_by: Optional[str] = None,
             desc_order: bool = False,
-            filters: dict = None
-    ) -> Sequence[RecipientModel]:
+            filters: dict = None,
+            cursor: Optional[str] = None,
+            count_mode: CountMode = "none",
+    ) -> Page[RecipientModel]:
         filters = filters or {}
-        recipients = await self.repo.get_by_user_id(
-            user.id,
+        recipients, total = await self.repo.list_page(
             limit=limit,
             skip=offset,
             order_by=order_by,
             desc_order=desc_order,
+            cursor=cursor,
+            count_mode=count_mode,
+            user_id=user.id,
             **filters,
         )
+        next_cursor = None
+        if recipients and len(recipients) == limit:
+            next_cursor = self.repo.make_cursor(recipients[-1], order_by, desc_order)
+        return Page[RecipientModel](
+            items=[RecipientModel.model_validate(recipient) for recipient in recipients],
+            next_cursor=next_cursor,
+            total=total,
+            total_is_estimate=count_mode == "estimated",
+        )
+
+    async def search(self, user: UserModel, query: str, limit: int = 20, offset: int = 0) -> List[RecipientModel]:
+        """Recipients of the user matching ``query``, best match first."""
+        recipients = await self.repo.search(query, offset, limit, user_id=user.id)
         return [RecipientModel.model_validate(recipient) for recipient in recipients]
 
     async def _get_model(self, recipient_id: UUID) -> Recipient:
@@ -0,0 +1,120 @@
+from uuid import UUID, uuid5
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Iterator, Iterable, List, Optional, Dict
+
+from dateutil.relativedelta import relativedelta
+
+from app.models import Event, EventOccurrence
+
+
+@dataclass(frozen=True)
+class Occurrence:
+    """Single instance of an event, either expanded on read or backed by a stored exception row."""
+    id: UUID
+    event_id: UUID
+    occurrence_date: date
+    created_at: datetime
+    is_cancelled: bool = False
+
+
+def virtual_occurrence_id(event_id: UUID, occurrence_date: date) -> UUID:
+    """Stable id of an expanded occurrence, so clients can address it like a stored one."""
+    return uuid5(event_id, occurrence_date.isoformat())
+
+
+def expand_dates(start_date: date, is_repeating: bool, from_date: date, to_date: date) -> Iterator[date]:
+    """Yield the dates of an event that fall into ``[from_date, to_date]``."""
+    if not is_repeating:
+        if from_date <= start_date <= to_date:
+            yield start_date
+        return
+
+    # yearly rule: offsets are taken from the start date, so 29 Feb comes back in leap years
+    years = max(0, from_date.year - start_date.year - 1)
+    while True:
+        current = start_date + relativedelta(years=years)
+        if current > to_date:
+            return
+        if current >= from_date:
+            yield current
+        years += 1
+
+
+def dates_to_materialize(start_date: date, last_date: Optional[date], today: date) -> List[date]:
+    """
+    Dates of a yearly event that follow ``last_date`` (or start at ``start_date`` when nothing is stored yet),
+    up to and including the first one that is not in the past.
+    """
+    if last_date is not None and last_date >= today:
+        return []
+
+    from_date = start_date if last_date is None else last_date + relativedelta(days=1)
+    result = []
+    for occurrence_date in expand_dates(start_date, True, from_date, max(from_date, today) + relativedelta(years=1)):
+        result.append(occurrence_date)
+        if occurrence_date >= today:
+            break
+    return result
+
+
+def is_event_date(event: Event, occurrence_date: date) -> bool:
+    return next(expand_dates(event.start_date, event.is_repeating, occurrence_date, occurrence_date), None) is not None
+
+
+def expand_event(
+        event: Event,
+        from_date: date,
+        to_date: date,
+        exceptions: Iterable[EventOccurrence] = (),
+        include_cancelled: bool = False,
+) -> List[Occurrence]:
+    """
+    Expand an event into its occurrences within ``[from_date, to_date]``.
+
+    Stored rows act as exceptions: a row replaces the expanded instance at its ``original_date`` (or at its own
+    date when no original date is set). Cancelled rows suppress the instance; other rows are emitted at their own
+    ``occurrence_date``.
+    """
+    overrides: Dict[date, EventOccurrence] = {}
+    for row in exceptions:
+        overrides[row.original_date or row.occurrence_date] = row
+
+    result = []
+    for occurrence_date in expand_dates(event.start_date, event.is_repeating, from_date, to_date):
+        if occurrence_date in overrides:
+            continue
+        result.append(Occurrence(
+            id=virtual_occurrence_id(event.id, occurrence_date),
+            event_id=event.id,
+            occurrence_date=occurrence_date,
+            created_at=event.created_at,
+        ))
+
+    for row in overrides.values():
+        if row.is_cancelled and not include_cancelled:
+            continue
+        if not from_date <= row.occurrence_date <= to_date:
+            continue
+        result.append(Occurrence(
+            id=row.id,
+            event_id=row.event_id,
+            occurrence_date=row.occurrence_date,
+            created_at=row.created_at,
+            is_cancelled=row.is_cancelled,
+        ))
+
+    result.sort(key=lambda occur: occur.occurrence_date)
+    return result
+
+
+def next_occurrence(
+        event: Event,
+        after: date,
+        exceptions: Iterable[EventOccurrence] = (),
+        horizon_years: int = 10,
+) -> Optional[Occurrence]:
+    """First non-cancelled occurrence on or after ``after``, looking at most ``horizon_years`` ahead."""
+    to_date = after + relativedelta(years=horizon_years)
+    occurrences = expand_event(event, after, to_date, exceptions)
+    return occurrences[0] if occurrences else None
@@ -1,13 +1,34 @@
 from uuid import UUID
+from typing import Optional, Protocol
 
+from app.core.config import get_settings
 from app.repositories.orm.user import UserRepository
 from app.exceptions.common import NotFoundError
 from app.schemas.user import UserModel, UserUpdate
+from app.utils.cache import TTLCache
+
+settings = get_settings()
+
+
+class UserCache(Protocol):
+    def get(self, key: UUID) -> Optional[UserModel]:
+        ...
+
+    def set(self, key: UUID, value: UserModel) -> None:
+        ...
+
+    def invalidate(self, key: UUID) -> None:
+        ...
+
+
+# shared by the requests of one process; entries of other processes go stale for at most the ttl
+user_cache: UserCache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
 
 
 class UserService:
-    def __init__(self, repo: UserRepository):
+    def __init__(self, repo: UserRepository, cache: UserCache = user_cache):
         self.repo = repo
+        self.cache = cache
 
     async def get_user_by_id(self, _id: UUID) -> UserModel:
         user = await self.repo.get_by_id(_id)
@@ -15,13 +36,22 @@ class UserService:
             raise NotFoundError("User")
         return UserModel.model_validate(user)
 
+    async def get_cached_user(self, _id: UUID) -> UserModel:
+        user = self.cache.get(_id)
+        if user is None:
+            user = await self.get_user_by_id(_id)
+            self.cache.set(_id, user)
+        return user
+
     async def update_profile(self, user_id: UUID, data: UserUpdate) -> UserModel:
         user = await self.repo.get_by_id(user_id)
         updated = await self.repo.update(user, data.model_dump(exclude_unset=True))
+        self.repo.after_commit(lambda: self.cache.invalidate(user_id))
         return UserModel.model_validate(updated)
 
     async def attach_avatar(self, user_id: UUID, media_id: UUID) -> UserModel:
         user = await self.repo.get_by_id(user_id)
         user.ava_id = media_id
         updated = await self.repo.update(user, {})
+        self.repo.after_commit(lambda: self.cache.invalidate(user_id))
         return UserModel.model_validate(updated)
@@ -1,17 +1,26 @@
+import os
+import mmap
+import shutil
+import tempfile
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from io import BytesIO
-
-import boto3
-from botocore.exceptions import BotoCoreError, ClientError
+from pathlib import Path
+from typing import BinaryIO, Union, Optional, Set
 
 from app.core.config import get_settings
+from app.utils.cache import TTLCache
 
 settings = get_settings()
 
 
 class MediaStorage(ABC):
     @abstractmethod
-    def upload(self, file: bytes, path: str, content_type: str) -> str:
+    def upload(self, file: Union[bytes, BinaryIO], path: str, content_type: str) -> str:
+        pass
+
+    @abstractmethod
+    def read(self, path: str) -> bytes:
         pass
 
     @abstractmethod
@@ -22,33 +31,112 @@ class MediaStorage(ABC):
     def exists(self, path: str) -> bool:
         pass
 
+    @abstractmethod
+    def exists_many(self, prefix: str) -> Set[str]:
+        """All stored paths under ``prefix`` (e.g. ``avatar/``), for reconciliation against the media table."""
+        pass
+
+    def path_from_url(self, url: str) -> Optional[str]:
+        """Storage path behind a url returned by ``upload``, or ``None`` for urls of another storage."""
+        return None
+
+
+@lru_cache
+def get_s3_session():
+    # boto3 is imported on first use, so processes that never touch S3 do not pay for it
+    import boto3
+
+    return boto3.session.Session(
+        aws_access_key_id=settings.AWS_ACCESS_KEY,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_REGION,
+    )
+
+
+@lru_cache
+def get_s3_client():
+    from botocore.config import Config
+
+    return get_s3_session().client(
+        "s3",
+        config=Config(
+            max_pool_connections=settings.AWS_S3_MAX_POOL_CONNECTIONS,
+            tcp_keepalive=True,
+            retries={"mode": "standard"},
+        ),
+    )
 
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=settings.AWS_ACCESS_KEY,
-    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    region_name=settings.AWS_REGION,
+
+@lru_cache
+def get_s3_transfer_config():
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig(
+        multipart_threshold=settings.AWS_S3_MULTIPART_THRESHOLD,
+        multipart_chunksize=settings.AWS_S3_MULTIPART_CHUNKSIZE,
+        max_concurrency=settings.AWS_S3_MAX_CONCURRENCY,
+    )
+
+
+def _object_size(file: Union[bytes, BinaryIO]) -> int:
+    if isinstance(file, bytes):
+        return len(file)
+    position = file.tell()
+    size = file.seek(0, os.SEEK_END) - position
+    file.seek(position)
+    return size
+
+
+# HEAD results, shared by all S3 storages of the process; keys are content-addressed, so entries rarely go stale
+s3_exists_cache: TTLCache[str, bool] = TTLCache(
+    settings.AWS_S3_EXISTS_CACHE_MAX_SIZE,
+    settings.AWS_S3_EXISTS_CACHE_TTL_SECONDS,
 )
 
 
 class S3MediaStorage(MediaStorage):
     def __init__(self):
-        self.s3_client = s3_client
-
-    def upload(self, file: bytes, path: str, content_type: str) -> str:
-        try:
-            file_like = BytesIO(file)
-            self.s3_client.upload_fileobj(
-                file_like,
-                settings.AWS_BUCKET_NAME,
-                path,
-                ExtraArgs={
-                    "ContentType": content_type,
-                }
-            )
-            return f"https://{settings.AWS_BUCKET_NAME}.s3.{settings.AWS_REGION}.amazonaws.com/{path}"
-        except (BotoCoreError, ClientError) as e:
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        self.s3_client = get_s3_client()
+        self._errors = (BotoCoreError, ClientError)
+        self._client_error = ClientError
+        self.exists_cache = s3_exists_cache
+        self.base_url = f"https://{settings.AWS_BUCKET_NAME}.s3.{settings.AWS_REGION}.amazonaws.com/"
+
+    def upload(self, file: Union[bytes, BinaryIO], path: str, content_type: str) -> str:
+        try:
+            if _object_size(file) < settings.AWS_S3_MULTIPART_THRESHOLD:
+                # a single request, without the transfer manager's threads and futures
+                self.s3_client.put_object(
+                    Bucket=settings.AWS_BUCKET_NAME,
+                    Key=path,
+                    Body=file,
+                    ContentType=content_type,
+                )
+            else:
+                # file objects are streamed to S3 in multipart chunks
+                file_like = BytesIO(file) if isinstance(file, bytes) else file
+                self.s3_client.upload_fileobj(
+                    file_like,
+                    settings.AWS_BUCKET_NAME,
+                    path,
+                    ExtraArgs={
+                        "ContentType": content_type,
+                    },
+                    Config=get_s3_transfer_config(),
+                )
+        except self._errors as e:
             raise RuntimeError(f"Error uploading file: {e}")
+        self.exists_cache.set(path, True)
+        return self.base_url + path
+
+    def read(self, path: str) -> bytes:
+        try:
+            response = self.s3_client.get_object(Bucket=settings.AWS_BUCKET_NAME, Key=path)
+            return response["Body"].read()
+        except self._errors as e:
+            raise RuntimeError(f"Error reading file: {e}")
 
     def delete(self, path: str):
         try:
@@ -56,8 +144,115 @@ class S3MediaStorage(MediaStorage):
                 Bucket=settings.AWS_BUCKET_NAME,
                 Key=path,
             )
-        except (BotoCoreError, ClientError) as e:
+        except self._errors as e:
             raise RuntimeError(f"Error deleting file: {e}")
+        self.exists_cache.set(path, False)
 
     def exists(self, path: str) -> bool:
-        raise NotImplementedError()
\ No newline at end of file
+        cached = self.exists_cache.get(path)
+        if cached is not None:
+            return cached
+        try:
+            self.s3_client.head_object(Bucket=settings.AWS_BUCKET_NAME, Key=path)
+            found = True
+        except self._client_error as e:
+            if e.response.get("Error", {}).get("Code") not in ("404", "NoSuchKey", "NotFound"):
+                raise RuntimeError(f"Error checking file: {e}")
+            found = False
+        except self._errors as e:
+            raise RuntimeError(f"Error checking file: {e}")
+        self.exists_cache.set(path, found)
+        return found
+
+    def exists_many(self, prefix: str) -> Set[str]:
+        """
+        Lists every key under ``prefix``, a thousand keys per request. Results bypass ``exists_cache``: a scan over
+        millions of keys would only evict the entries the uploader relies on.
+        """
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        keys = set()
+        try:
+            for page in paginator.paginate(Bucket=settings.AWS_BUCKET_NAME, Prefix=prefix):
+                keys.update(item["Key"] for item in page.get("Contents", []))
+        except self._errors as e:
+            raise RuntimeError(f"Error listing files: {e}")
+        return keys
+
+    def path_from_url(self, url: str) -> Optional[str]:
+        return url.removeprefix(self.base_url) if url.startswith(self.base_url) else None
+
+
+class LocalFSMediaStorage(MediaStorage):
+    """
+    Stores files under ``root`` at their content-addressed paths. Writes go to a temporary file that is renamed into
+    place, so readers never see partial files; reads are memory-mapped.
+    """
+
+    def __init__(self, root: str = None, base_url: str = None):
+        self.root = Path(root or settings.MEDIA_LOCAL_ROOT).resolve()
+        self.base_url = (base_url or settings.MEDIA_LOCAL_BASE_URL).rstrip("/")
+
+    def _full_path(self, path: str) -> Path:
+        full_path = (self.root / path).resolve()
+        if not full_path.is_relative_to(self.root):
+            raise ValueError(f"Path outside of media root: {path}")
+        return full_path
+
+    def upload(self, file: Union[bytes, BinaryIO], path: str, content_type: str) -> str:
+        full_path = self._full_path(path)
+        if full_path.exists():
+            return f"{self.base_url}/{path}"
+
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=full_path.parent, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                if isinstance(file, bytes):
+                    tmp.write(file)
+                else:
+                    shutil.copyfileobj(file, tmp)
+            os.replace(tmp_path, full_path)
+        except OSError as e:
+            os.unlink(tmp_path)
+            raise RuntimeError(f"Error uploading file: {e}")
+        return f"{self.base_url}/{path}"
+
+    def read(self, path: str) -> Union[bytes, mmap.mmap]:
+        try:
+            with open(self._full_path(path), "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return b""
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError as e:
+            raise RuntimeError(f"Error reading file: {e}")
+
+    def delete(self, path: str):
+        try:
+            self._full_path(path).unlink(missing_ok=True)
+        except OSError as e:
+            raise RuntimeError(f"Error deleting file: {e}")
+
+    def exists(self, path: str) -> bool:
+        return self._full_path(path).is_file()
+
+    def exists_many(self, prefix: str) -> Set[str]:
+        directory = self._full_path(prefix)
+        return {
+            file.relative_to(self.root).as_posix()
+            for file in directory.rglob("*")
+            if file.is_file() and not file.name.startswith(".upload-")
+        }
+
+    def path_from_url(self, url: str) -> Optional[str]:
+        prefix = self.base_url + "/"
+        return url.removeprefix(prefix) if url.startswith(prefix) else None
+
+
+_STORAGES = {
+    "s3": S3MediaStorage,
+    "local": LocalFSMediaStorage,
+}
+
+
+def get_media_storage() -> MediaStorage:
+    return _STORAGES[settings.MEDIA_STORAGE_BACKEND]()
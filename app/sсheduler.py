@@ -1,16 +1,43 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
+from app.core.config import get_settings
 from app.core.database import async_session
+from app.mail import drain_outbox, get_mail_transport
 from app.service.event import generate_missing_occurrences
 
 
+settings = get_settings()
+
+
 scheduler = AsyncIOScheduler(
     timezone="UTC",
     job_defaults={"max_instances": 1, "coalesce": True}
 )
 
 
-async def run_generate_occur() -> None:
+def _report_chunk(chunk: int, scanned: int, created: int) -> None:
+    print(f"[Scheduler] Occurrences chunk {chunk}: scanned {scanned} events, created {created}")
+
+
+async def run_generate_occur(catch_up: bool = False) -> None:
     async with async_session() as db:
-        created = await generate_missing_occurrences(db)
+        created = await generate_missing_occurrences(
+            db,
+            chunk_size=settings.EVENT_OCCURRENCES_CHUNK_SIZE,
+            on_progress=_report_chunk,
+            catch_up=catch_up,
+        )
         print(f"[Scheduler] Generated new event occurrences: {created}")
+
+
+async def run_drain_outbox() -> None:
+    async with async_session() as db:
+        sent = await drain_outbox(
+            db,
+            get_mail_transport(),
+            batch_size=settings.MAIL_OUTBOX_BATCH_SIZE,
+            max_attempts=settings.MAIL_OUTBOX_MAX_ATTEMPTS,
+            retry_base_seconds=settings.MAIL_OUTBOX_RETRY_BASE_SECONDS,
+        )
+        if sent:
+            print(f"[Scheduler] Sent outbox mails: {sent}")
@@ -0,0 +1,57 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+from app.exceptions.common import ServiceBusy
+
+
+R = TypeVar("R")
+
+
+@dataclass
+class ExecutorStats:
+    workers: int
+    in_flight: int = 0
+    queued: int = 0
+    peak_queued: int = 0
+    completed: int = 0
+    rejected: int = 0
+
+
+class BoundedExecutor:
+    """
+    Fixed-size thread pool for blocking calls made from async code. At most ``max_workers`` calls run at once;
+    the rest wait in the pool queue, whose depth is tracked in ``stats``. With ``max_queued`` set, calls that would
+    queue beyond it are rejected with ``ServiceBusy`` instead of waiting.
+    """
+
+    def __init__(self, max_workers: int, name: str, max_queued: Optional[int] = None):
+        self.name = name
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._stats = ExecutorStats(workers=max_workers)
+
+    async def run(self, fn: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+        # counters are only touched from the event loop, so they need no locking
+        stats = self._stats
+        if self.max_queued is not None and stats.in_flight - stats.workers >= self.max_queued:
+            stats.rejected += 1
+            raise ServiceBusy(self.name)
+        stats.in_flight += 1
+        stats.queued = max(0, stats.in_flight - stats.workers)
+        stats.peak_queued = max(stats.peak_queued, stats.queued)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+        finally:
+            stats.in_flight -= 1
+            stats.queued = max(0, stats.in_flight - stats.workers)
+            stats.completed += 1
+
+    def stats(self) -> dict:
+        return asdict(self._stats)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
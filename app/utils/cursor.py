@@ -0,0 +1,54 @@
+import json
+import base64
+import binascii
+from uuid import UUID
+from decimal import Decimal
+from datetime import date, datetime
+from typing import Any, Optional
+
+from app.exceptions.common import InvalidCursor
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, UUID):
+        return value.hex
+    return value
+
+
+def _load_value(value: Any, python_type: type) -> Any:
+    if value is None:
+        return None
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    if python_type is UUID:
+        return UUID(value)
+    return python_type(value)
+
+
+def encode_cursor(order_by: Optional[str], desc_order: bool, key: Any, _id: UUID) -> str:
+    """Pack the sort key and id of the last row of a page into an opaque url-safe token."""
+    payload = {"o": order_by, "d": desc_order, "k": _dump_value(key), "i": _id.hex}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, order_by: Optional[str], desc_order: bool, key_type: type) -> tuple[Any, UUID]:
+    """Unpack a cursor produced by ``encode_cursor`` for the same sorting, returning ``(key, id)``."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload["o"] != order_by or payload["d"] != desc_order:
+            raise InvalidCursor("cursor does not match requested sorting")
+        return _load_value(payload["k"], key_type), UUID(payload["i"])
+    except InvalidCursor:
+        raise
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor("malformed cursor") from e
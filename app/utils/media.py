@@ -1,5 +1,67 @@
 import hashlib
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from PIL import Image, UnidentifiedImageError
+
+from app.core.config import get_settings
+from app.exceptions.media import MediaValidateFailure
+from app.utils.concurrency import BoundedExecutor
+
+settings = get_settings()
+
+CHUNK_SIZE = 64 * 1024
+
+# hashlib and most of Pillow's decoding release the GIL, and threads can share the spooled upload file
+media_executor = BoundedExecutor(
+    max_workers=settings.MEDIA_PROBE_WORKERS,
+    name="Media processing",
+    max_queued=settings.MEDIA_PROBE_MAX_QUEUED,
+)
+
+
+@dataclass
+class ImageProbe:
+    size_bytes: int
+    hash: str
+    width: int
+    height: int
 
 
 def calculate_hash(file_bytes: bytes) -> str:
     return hashlib.sha256(file_bytes).hexdigest()
+
+
+def probe_image(fileobj: BinaryIO) -> tuple[int, int]:
+    """
+    Width and height of an image after checking its integrity. Pillow reads the header and then streams
+    through ``fileobj`` without loading the image into memory.
+    """
+    with Image.open(fileobj) as image:
+        width, height = image.size
+        image.verify()
+    return width, height
+
+
+def inspect_image(fileobj: BinaryIO, max_size: int) -> ImageProbe:
+    """
+    Hash ``fileobj`` chunk by chunk, failing as soon as it grows past ``max_size``, then probe it as an image.
+    The file is rewound afterwards.
+    """
+    digest = hashlib.sha256()
+    size_bytes = 0
+    fileobj.seek(0)
+    while chunk := fileobj.read(CHUNK_SIZE):
+        size_bytes += len(chunk)
+        if size_bytes > max_size:
+            raise MediaValidateFailure("File too large")
+        digest.update(chunk)
+
+    fileobj.seek(0)
+    try:
+        width, height = probe_image(fileobj)
+    except (UnidentifiedImageError, OSError, SyntaxError):
+        raise MediaValidateFailure("Invalid image file")
+    fileobj.seek(0)
+
+    return ImageProbe(size_bytes=size_bytes, hash=digest.hexdigest(), width=width, height=height)
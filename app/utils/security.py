@@ -1,9 +1,17 @@
+import time
+import hashlib
+import threading
+from uuid import UUID
+from typing import Dict, Tuple
+
 import bcrypt
-from jose import jwt
+from jose import jwt, JWTError
 from datetime import datetime, timedelta
 
 from app.core.enums import TokenType
 from app.core.config import get_settings
+from app.utils.cache import TTLCache
+from app.utils.concurrency import BoundedExecutor
 
 settings = get_settings()
 
@@ -19,10 +27,22 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode("UTF-8"), hashed_password.encode("UTF-8"))
 
 
+# bcrypt releases the GIL, so a few threads keep hashing off the event loop without starving it
+password_executor = BoundedExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, name="bcrypt")
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_executor.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_executor.run(verify_password, plain_password, hashed_password)
+
+
 def create_jwt_token(payload: dict, expires_delta: timedelta) -> str:
     to_encode = payload.copy()
-    expire = datetime.utcnow() + expires_delta
-    to_encode.update({"exp": expire})
+    now = datetime.utcnow()
+    to_encode.update({"exp": now + expires_delta, "iat": now})
     return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
@@ -45,3 +65,68 @@ def decode_token(token: str):
         options={"require": ["exp", "type"]},
     )
     return payload
+
+
+class VerifiedTokenCache:
+    """
+    Payloads of recently verified tokens, keyed by a hash of the token and expiring no later than the token itself,
+    so a token reused within a short window is decoded and signature-checked once.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, max_revocations: int = 100000):
+        self._payloads: TTLCache[bytes, dict] = TTLCache(maxsize=maxsize, ttl=ttl)
+        # user id -> (second of revocation, time its last earlier-issued token expires); never evicted by size
+        self._revoked: Dict[str, Tuple[int, float]] = {}
+        self._max_revocations = max_revocations
+        self._token_lifetime = max(delta.total_seconds() for delta in _EXPIRES_DELTAS.values())
+        self._untrusted_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def trusted(self) -> bool:
+        """
+        ``False`` while a revocation could not be stored: until the tokens it covers have expired, callers have to
+        check the user in the database instead of relying on cached users or token claims.
+        """
+        return time.time() >= self._untrusted_until
+
+    def decode(self, token: str) -> dict:
+        key = hashlib.sha256(token.encode("UTF-8")).digest()
+        payload = self._payloads.get(key)
+        if payload is None:
+            payload = decode_token(token)
+            self._payloads.set(key, payload, ttl=payload["exp"] - time.time())
+        if self._is_revoked(payload):
+            raise JWTError("Token revoked")
+        return dict(payload)
+
+    def revoke_user(self, user_id: UUID) -> None:
+        """
+        Reject every token of the user issued before the current second. Revocations are kept by this process only,
+        other workers accept the tokens until they expire.
+        """
+        now = time.time()
+        with self._lock:
+            if user_id.hex not in self._revoked and len(self._revoked) >= self._max_revocations:
+                self._revoked = {user: entry for user, entry in self._revoked.items() if entry[1] > now}
+            if user_id.hex in self._revoked or len(self._revoked) < self._max_revocations:
+                self._revoked[user_id.hex] = (int(now), now + self._token_lifetime)
+            else:
+                # dropping a revocation would let its tokens through again
+                self._untrusted_until = now + self._token_lifetime
+                print(f"Token revocations full ({self._max_revocations}), verifying users against the database")
+
+    def _is_revoked(self, payload: dict) -> bool:
+        entry = self._revoked.get(payload.get("id"))
+        if entry is None:
+            return False
+        revoked_at, _ = entry
+        # ``iat`` has whole seconds: a token issued in the second of the revocation, e.g. by logging in again, is kept
+        return payload.get("iat", 0) < revoked_at
+
+
+token_cache = VerifiedTokenCache(
+    maxsize=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+    max_revocations=settings.TOKEN_REVOCATIONS_MAX_SIZE,
+)
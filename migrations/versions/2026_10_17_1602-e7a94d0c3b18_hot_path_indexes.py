@@ -0,0 +1,60 @@
+"""hot path indexes
+
+Revision ID: e7a94d0c3b18
+Revises: 5c2f8e1a7d93
+Create Date: 2026-10-17 16:02:31.775409
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a94d0c3b18'
+down_revision: Union[str, None] = '5c2f8e1a7d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_event_occurrences_event_id_occurrence_date', 'event_occurrences',
+        ['event_id', 'occurrence_date'], unique=False,
+    )
+    op.create_index(
+        'ix_event_occurrences_event_id_original_date', 'event_occurrences',
+        ['event_id', 'original_date'], unique=False,
+    )
+    op.create_index(
+        'ix_events_user_id_active', 'events', ['user_id', 'deleted_at'], unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+    op.create_index(
+        'ix_events_is_global_active', 'events', ['is_global', 'deleted_at'], unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+    op.create_index(
+        'ix_gift_ideas_user_id_active', 'gift_ideas', ['user_id', 'archived_at'], unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+        sqlite_where=sa.text('deleted_at IS NULL'),
+    )
+    op.create_index(
+        'ix_gift_ideas_is_global_active', 'gift_ideas', ['is_global', 'archived_at'], unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+        sqlite_where=sa.text('deleted_at IS NULL'),
+    )
+    op.create_index(op.f('ix_recipients_user_id'), 'recipients', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_recipients_user_id'), table_name='recipients')
+    op.drop_index('ix_gift_ideas_is_global_active', table_name='gift_ideas')
+    op.drop_index('ix_gift_ideas_user_id_active', table_name='gift_ideas')
+    op.drop_index('ix_events_is_global_active', table_name='events')
+    op.drop_index('ix_events_user_id_active', table_name='events')
+    op.drop_index('ix_event_occurrences_event_id_original_date', table_name='event_occurrences')
+    op.drop_index('ix_event_occurrences_event_id_occurrence_date', table_name='event_occurrences')
@@ -0,0 +1,53 @@
+"""search indexes
+
+Revision ID: c41d7e9a2b56
+Revises: 8b4e2a7f0c15
+Create Date: 2026-10-17 19:30:12.408317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7e9a2b56'
+down_revision: Union[str, None] = '8b4e2a7f0c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRIGRAM_COLUMNS = {
+    'gift_ideas': ['title', 'description'],
+    'recipients': ['name', 'relation', 'notes'],
+}
+
+
+def _document(columns: Sequence[str]) -> str:
+    # must match app.core.models.search.SearchIndex.document, otherwise queries do not use the index
+    content = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+    return f"to_tsvector('simple'::regconfig, {content})"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, columns in TRIGRAM_COLUMNS.items():
+        op.create_index(
+            f'ix_{table}_search', table, [sa.text(_document(columns))], unique=False,
+            postgresql_using='gin',
+        )
+        for column in columns:
+            op.create_index(
+                f'ix_{table}_{column}_trgm', table, [column], unique=False,
+                postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'},
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, columns in TRIGRAM_COLUMNS.items():
+        for column in reversed(columns):
+            op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
+        op.drop_index(f'ix_{table}_search', table_name=table)
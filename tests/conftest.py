@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, Asyn
 
 from app.main import app as _app
 from app.core.models.base import Base
+from app.core.database import unit_of_work
 import app.models  # noqa
 from app.models.auth import RootUser, SimpleUser
 from app.utils.security import hash_password
@@ -38,7 +39,7 @@ async def clean_tables(db_session):
 @pytest.fixture(scope="module")
 async def async_client() -> AsyncGenerator[AsyncClient, Any]:
     async def _override_get_session() -> AsyncGenerator[AsyncSession, Any]:
-        async with TestSessionLocal() as session:
+        async with unit_of_work(TestSessionLocal) as session:
             yield session
 
     _app.dependency_overrides[get_session] = _override_get_session
@@ -1,4 +1,19 @@
+import time
+from uuid import uuid4
+
 import pytest
+from jose import jwt, JWTError
+
+from app.core.config import get_settings
+from app.models import SimpleUser
+from app.repositories.orm import UserRepository
+from app.schemas.user import UserUpdate
+from app.service.auth import AuthService
+from app.service.user import UserService
+from app.utils.cache import TTLCache
+from app.utils.security import VerifiedTokenCache
+
+settings = get_settings()
 
 @pytest.mark.asyncio
 async def test_register_user(async_client):
@@ -65,4 +80,98 @@ async def test_get_current_user(async_client, simple_user_token_headers):
     assert response.status_code == 200
     user = response.json()
     assert user["email"] == "user@example.com"
-    assert user["role"] == "USER"
\ No newline at end of file
+    assert user["role"] == "USER"
+
+@pytest.mark.asyncio
+async def test_cached_user_is_invalidated_when_profile_update_commits(db_session):
+    user = SimpleUser(email="cached@example.com", username="cached", hashed_password="x", is_active=True)
+    db_session.add(user)
+    await db_session.commit()
+    user_id = user.id
+    service = UserService(UserRepository(db_session), cache=TTLCache(maxsize=10, ttl=60))
+
+    first = await service.get_cached_user(user_id)
+    assert await service.get_cached_user(user_id) is first
+
+    await service.update_profile(user_id, UserUpdate(display_name="Rolled back"))
+    await db_session.rollback()
+    assert await service.get_cached_user(user_id) is first
+
+    await service.update_profile(user_id, UserUpdate(display_name="New name"))
+    # concurrent requests keep reading the committed row until the change is committed
+    assert await service.get_cached_user(user_id) is first
+    await db_session.commit()
+    refreshed = await service.get_cached_user(user_id)
+    assert refreshed is not first
+    assert refreshed.display_name == "New name"
+
+
+def earlier_token(user_id) -> str:
+    """Access token issued in an earlier second than a revocation happening now."""
+    now = int(time.time())
+    return jwt.encode(
+        {"id": user_id.hex, "role": "USER", "type": "access", "iat": now - 1, "exp": now + 60},
+        settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM,
+    )
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_issued_tokens(async_client, db_session):
+    user = SimpleUser(email="logout@example.com", username="logout", hashed_password="x", is_active=True)
+    db_session.add(user)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {earlier_token(user.id)}"}
+    assert (await async_client.get("/api/v1/users/me", headers=headers)).status_code == 200
+
+    response = await async_client.post("/api/v1/auth/logout", headers=headers)
+    assert response.status_code == 204
+    assert (await async_client.get("/api/v1/users/me", headers=headers)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_deactivation_revokes_tokens_once_committed(db_session):
+    user = SimpleUser(email="deactivated@example.com", username="deactivated", hashed_password="x", is_active=True)
+    db_session.add(user)
+    await db_session.commit()
+    user_id = user.id
+    tokens = VerifiedTokenCache(maxsize=10, ttl=60)
+    service = AuthService(UserRepository(db_session), cache=TTLCache(maxsize=10, ttl=60), tokens=tokens)
+
+    token = earlier_token(user_id)
+
+    await service.deactivate_user(user_id)
+    assert tokens.decode(token)["id"] == user_id.hex
+    await db_session.commit()
+    with pytest.raises(JWTError):
+        tokens.decode(token)
+
+
+@pytest.mark.asyncio
+async def test_users_are_checked_in_the_database_while_revocations_overflow(async_client, db_session, monkeypatch):
+    user = SimpleUser(email="overflow@example.com", username="overflow", hashed_password="x", is_active=True)
+    db_session.add(user)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {earlier_token(user.id)}"}
+    assert (await async_client.get("/api/v1/users/me", headers=headers)).status_code == 200
+
+    # deactivated by another process: this one still caches the active user
+    user.is_active = False
+    await db_session.commit()
+    assert (await async_client.get("/api/v1/users/me", headers=headers)).status_code == 200
+
+    tokens = VerifiedTokenCache(maxsize=10, ttl=60, max_revocations=0)
+    tokens.revoke_user(uuid4())
+    monkeypatch.setattr("app.api.v1.dependencies.base.token_cache", tokens)
+    assert (await async_client.get("/api/v1/users/me", headers=headers)).status_code == 401
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
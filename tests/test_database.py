@@ -0,0 +1,101 @@
+import time
+
+import pytest
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.api.v1.dependencies import factories
+from app.api.v1.features.system import endpoints as system_endpoints
+from app.core.config import get_settings
+from app.core.database import engine_options, pool_stats, async_session, unit_of_work
+from app.models import SimpleUser
+from app.repositories.orm import UserRepository
+
+
+def test_engine_options_configure_pool_and_asyncpg_connections():
+    settings = get_settings()
+    options = engine_options("postgresql+asyncpg://user@localhost/db", read_only=True)
+
+    assert options["pool_size"] == settings.DATABASE_POOL_SIZE
+    assert options["pool_pre_ping"] is settings.DATABASE_POOL_PRE_PING
+    connect_args = options["connect_args"]
+    assert connect_args["prepared_statement_cache_size"] == settings.DATABASE_STATEMENT_CACHE_SIZE
+    assert connect_args["server_settings"]["statement_timeout"] == str(settings.DATABASE_STATEMENT_TIMEOUT_MS)
+    assert connect_args["server_settings"]["default_transaction_read_only"] == "on"
+
+
+def test_engine_options_leave_sqlite_pool_alone():
+    assert engine_options("sqlite+aiosqlite:///:memory:") == {"echo": get_settings().DEBUG}
+    assert "primary" in pool_stats()
+
+
+@pytest.mark.asyncio
+async def test_executor_stats_are_exposed_next_to_the_pool():
+    stats = await system_endpoints.executors()
+
+    assert set(stats) == {"password", "media", "variants"}
+    assert stats["password"]["workers"] == get_settings().PASSWORD_HASH_WORKERS
+    assert all({"in_flight", "queued", "peak_queued", "rejected"} <= set(pool) for pool in stats.values())
+
+
+def request(method: str, cookie: str = None) -> Request:
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    return Request({"type": "http", "method": method, "headers": headers})
+
+
+def test_reads_go_to_replica_unless_the_client_wrote_recently(monkeypatch):
+    replica = object()
+    monkeypatch.setattr(factories, "replica_engine", object())
+    monkeypatch.setattr(factories, "replica_session", replica)
+
+    assert factories.route_session(request("GET")) is replica
+    assert factories.route_session(request("POST")) is async_session
+    # the cookie alone routes the read, no matter which process set it
+    sticky = f"{factories.STICKY_COOKIE}={time.time() + 5}"
+    assert factories.route_session(request("GET", sticky)) is async_session
+    assert factories.route_session(request("GET", f"{factories.STICKY_COOKIE}={time.time() - 1}")) is replica
+    assert factories.route_session(request("GET", f"{factories.STICKY_COOKIE}=garbage")) is replica
+
+
+@pytest.mark.asyncio
+async def test_write_responses_set_the_sticky_cookie(monkeypatch):
+    monkeypatch.setattr(factories, "replica_engine", object())
+    monkeypatch.setattr(factories, "replica_session", async_session)
+
+    for method, sticky in [("GET", False), ("POST", True)]:
+        response = Response()
+        session = factories.get_session(request(method), response)
+        await anext(session)
+        await session.aclose()
+        assert (factories.STICKY_COOKIE in response.headers.get("set-cookie", "")) is sticky
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_commits_once_and_rolls_back_on_error(db_session):
+    factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+    async with unit_of_work(factory) as session:
+        user = await UserRepository(session).add(
+            SimpleUser(email="uow@example.com", username="uow", hashed_password="x")
+        )
+        # server default returned by the INSERT, without a refresh
+        assert user.created_at is not None
+        assert not session.is_modified(user)
+
+    with pytest.raises(RuntimeError):
+        async with unit_of_work(factory) as session:
+            await UserRepository(session).add(SimpleUser(email="lost@example.com", username="lost", hashed_password="x"))
+            raise RuntimeError()
+
+    emails = (await db_session.scalars(select(SimpleUser.email))).all()
+    assert emails == ["uow@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_update_loads_values_assigned_as_sql_expressions(db_session):
+    user = await UserRepository(db_session).add(SimpleUser(email="expr@example.com", username="expr", hashed_password="x"))
+
+    await UserRepository(db_session).update(user, {"display_name": func.upper("expr")})
+
+    assert user.display_name == "EXPR"
@@ -1,4 +1,13 @@
+from datetime import date, datetime, timedelta, timezone
+
 import pytest
+from sqlalchemy import select, func
+
+from app.models import Event, EventOccurrence, SimpleUser
+from app.service.event import (
+    iter_occurrences_in_range, occurrence_cancel, occurrence_reschedule, generate_missing_occurrences,
+)
+from app.service.recurrence import expand_dates, dates_to_materialize
 
 
 @pytest.mark.asyncio
@@ -22,4 +31,153 @@ async def test_create_event(async_client, simple_user_token_headers):
     assert data["is_global"] == event_data["is_global"]
     assert data["is_repeating"] == event_data["is_repeating"]
     assert data["type"] == event_data["type"]
-    assert data["start_date"] == event_data["start_date"]
\ No newline at end of file
+    assert data["start_date"] == event_data["start_date"]
+
+
+@pytest.mark.asyncio
+async def test_occurrences_in_range_are_expanded_on_read(db_session):
+    owner = SimpleUser(email="owner@example.com", username="owner", hashed_password="x")
+    stranger = SimpleUser(email="stranger@example.com", username="stranger", hashed_password="x")
+    db_session.add_all([owner, stranger])
+    await db_session.flush()
+
+    event = Event(title="Anniversary", is_global=False, is_repeating=True, start_date=date(2020, 5, 1), user_id=owner.id)
+    db_session.add(event)
+    await db_session.commit()
+    await db_session.refresh(event)
+
+    await occurrence_cancel(event, date(2023, 5, 1), db_session)
+    await occurrence_reschedule(event, date(2024, 5, 1), date(2024, 6, 1), db_session)
+
+    dates = [
+        occur.occurrence_date
+        async for occur in iter_occurrences_in_range(owner, db_session, date(2022, 1, 1), date(2024, 12, 31))
+    ]
+    assert dates == [date(2022, 5, 1), date(2024, 6, 1)]
+
+    hidden = [
+        occur async for occur in iter_occurrences_in_range(stranger, db_session, date(2020, 1, 1), date(2026, 12, 31))
+    ]
+    assert hidden == []
+
+
+@pytest.mark.asyncio
+async def test_occurrences_moved_into_range_from_outside_the_series_are_listed(db_session):
+    owner = SimpleUser(email="mover@example.com", username="mover", hashed_password="x")
+    db_session.add(owner)
+    await db_session.flush()
+    once = Event(title="Party", is_global=False, is_repeating=False, start_date=date(2023, 3, 1), user_id=owner.id)
+    yearly = Event(title="Holiday", is_global=False, is_repeating=True, start_date=date(2024, 5, 1), user_id=owner.id)
+    db_session.add_all([once, yearly])
+    await db_session.commit()
+
+    await occurrence_reschedule(once, date(2023, 3, 1), date(2024, 6, 10), db_session)
+    await occurrence_reschedule(yearly, date(2024, 5, 1), date(2024, 4, 20), db_session)
+
+    async def listed(from_date, to_date):
+        return [
+            (occur.event_id, occur.occurrence_date)
+            async for occur in iter_occurrences_in_range(owner, db_session, from_date, to_date)
+        ]
+
+    assert await listed(date(2024, 6, 1), date(2024, 6, 30)) == [(once.id, date(2024, 6, 10))]
+    assert await listed(date(2024, 4, 1), date(2024, 4, 30)) == [(yearly.id, date(2024, 4, 20))]
+    assert await listed(date(2023, 1, 1), date(2023, 12, 31)) == []
+
+
+def test_expand_dates_keeps_leap_day():
+    dates = list(expand_dates(date(2020, 2, 29), True, date(2021, 1, 1), date(2024, 12, 31)))
+
+    assert dates == [date(2021, 2, 28), date(2022, 2, 28), date(2023, 2, 28), date(2024, 2, 29)]
+
+
+def stored_dates(rows, event_id):
+    return sorted(row.occurrence_date for row in rows if row.event_id == event_id)
+
+
+@pytest.mark.asyncio
+async def test_generate_missing_occurrences_drains_due_events_in_chunks(db_session):
+    today = date.today()
+    start = date(today.year - 3, 1, 15)
+    due = [
+        Event(title=f"Due {i}", is_global=True, is_repeating=True, start_date=start, next_due_date=start)
+        for i in range(5)
+    ]
+    skipped = [
+        Event(title="Once", is_global=True, is_repeating=False, start_date=start),
+        Event(title="Deleted", is_global=True, is_repeating=True, start_date=start, next_due_date=start,
+              deleted_at=datetime.now(timezone.utc)),
+    ]
+    db_session.add_all(due + skipped)
+    await db_session.commit()
+
+    progress = []
+    created = await generate_missing_occurrences(db_session, chunk_size=2, on_progress=lambda *p: progress.append(p))
+
+    expected = dates_to_materialize(start, None, today)
+    assert created == 5 * len(expected)
+    assert [(chunk, scanned) for chunk, scanned, _ in progress] == [(1, 2), (2, 2), (3, 1)]
+    rows = (await db_session.scalars(select(EventOccurrence))).all()
+    for event in due:
+        assert stored_dates(rows, event.id) == expected
+    assert all(stored_dates(rows, event.id) == [] for event in skipped)
+
+    watermarks = set(await db_session.scalars(select(Event.next_due_date).where(Event.id.in_([e.id for e in due]))))
+    assert watermarks == {expected[-1] + timedelta(days=1)}
+    assert await generate_missing_occurrences(db_session) == 0
+
+
+@pytest.mark.asyncio
+async def test_generate_missing_occurrences_fills_missed_days_and_catches_up(db_session):
+    today = date.today()
+    start = date(today.year - 3, 1, 15)
+    # the job stopped running after the first year
+    missed = Event(title="Missed", is_global=True, is_repeating=True, start_date=start,
+                   next_due_date=start + timedelta(days=1))
+    # created before watermarks existed, with the first year stored
+    legacy = Event(title="Legacy", is_global=True, is_repeating=True, start_date=start)
+    db_session.add_all([missed, legacy])
+    await db_session.flush()
+    db_session.add_all([
+        EventOccurrence(event_id=missed.id, occurrence_date=start),
+        EventOccurrence(event_id=legacy.id, occurrence_date=start),
+    ])
+    await db_session.commit()
+
+    expected = dates_to_materialize(start, None, today)
+    assert await generate_missing_occurrences(db_session) == len(expected) - 1
+    rows = (await db_session.scalars(select(EventOccurrence))).all()
+    assert stored_dates(rows, missed.id) == expected
+    assert stored_dates(rows, legacy.id) == [start]
+
+    assert await generate_missing_occurrences(db_session, catch_up=True) == len(expected) - 1
+    rows = (await db_session.scalars(select(EventOccurrence))).all()
+    assert stored_dates(rows, legacy.id) == expected
+    await db_session.refresh(legacy)
+    assert legacy.next_due_date == expected[-1] + timedelta(days=1)
+
+
+@pytest.mark.asyncio
+async def test_generate_missing_occurrences_keeps_cancelled_and_moved_instances(db_session):
+    owner = SimpleUser(email="keeper@example.com", username="keeper", hashed_password="x")
+    db_session.add(owner)
+    await db_session.flush()
+    today = date.today()
+    cancelled = Event(title="Cancelled", is_global=False, is_repeating=True, start_date=today, next_due_date=today,
+                      user_id=owner.id)
+    moved = Event(title="Moved", is_global=False, is_repeating=True, start_date=today, next_due_date=today,
+                  user_id=owner.id)
+    db_session.add_all([cancelled, moved])
+    await db_session.commit()
+    await occurrence_cancel(cancelled, today, db_session)
+    await occurrence_reschedule(moved, today, today + timedelta(days=2), db_session)
+    await db_session.commit()
+
+    assert await generate_missing_occurrences(db_session) == 0
+
+    listed = [
+        (occur.event_id, occur.occurrence_date)
+        async for occur in iter_occurrences_in_range(owner, db_session, today, today + timedelta(days=7))
+    ]
+    assert listed == [(moved.id, today + timedelta(days=2))]
+    assert await db_session.scalar(select(func.count()).select_from(EventOccurrence)) == 2
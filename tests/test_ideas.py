@@ -0,0 +1,95 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from app.exceptions.common import NotFoundError, PolicyPermissionError
+from app.models import SimpleUser, RootUser, GiftIdea
+from app.models.idea import idea_search
+from app.repositories.orm import IdeaRepository
+from app.repositories.orm.base import SQLAlchemyRepository, SearchableRepositoryMixin
+from app.schemas.idea import IdeaCreate, IdeaBulkUpdate
+from app.schemas.user import UserModel
+from app.service.idea import IdeaService, IdeaPolicy
+
+
+async def make_user(db_session, cls, name: str) -> UserModel:
+    user = cls(email=f"{name}@example.com", username=name, hashed_password="x", is_active=True)
+    db_session.add(user)
+    await db_session.commit()
+    return UserModel.model_validate(user)
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_update_and_delete_ideas(db_session):
+    user = await make_user(db_session, SimpleUser, "bulk")
+    service = IdeaService(IdeaRepository(db_session), IdeaPolicy)
+
+    created = await service.create_many(user, [IdeaCreate(title=f"idea {i}", is_global=False) for i in range(3)])
+    assert [idea.title for idea in created] == ["idea 0", "idea 1", "idea 2"]
+    assert all(idea.created_at for idea in created)
+
+    updated = await service.update_many(user, [
+        IdeaBulkUpdate(id=created[0].id, title="renamed"),
+        IdeaBulkUpdate(id=created[1].id, description="details"),
+        IdeaBulkUpdate(id=created[0].id, description="both"),
+    ])
+    assert [(idea.title, idea.description) for idea in updated] == [("renamed", "both"), ("idea 1", "details")]
+    assert all(idea.updated_at for idea in updated)
+
+    await service.soft_delete_many(user, [created[0].id, created[1].id])
+    page = await service.get_user_ideas(user, filters={})
+    assert [idea.id for idea in page.items] == [created[2].id]
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_checks_the_whole_batch(db_session):
+    user = await make_user(db_session, SimpleUser, "owner")
+    root = await make_user(db_session, RootUser, "root")
+    service = IdeaService(IdeaRepository(db_session), IdeaPolicy)
+    [own] = await service.create_many(user, [IdeaCreate(title="own", is_global=False)])
+    [foreign] = await service.create_many(root, [IdeaCreate(title="global", is_global=True)])
+
+    with pytest.raises(PolicyPermissionError):
+        await service.update_many(user, [IdeaBulkUpdate(id=own.id, title="ok"), IdeaBulkUpdate(id=foreign.id, title="no")])
+    with pytest.raises(PolicyPermissionError):
+        await service.create_many(user, [IdeaCreate(title="mine", is_global=False), IdeaCreate(title="all", is_global=True)])
+    with pytest.raises(NotFoundError):
+        await service.soft_delete_many(user, [own.id, uuid4()])
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_matches_and_follows_updates(db_session):
+    user = await make_user(db_session, SimpleUser, "searcher")
+    service = IdeaService(IdeaRepository(db_session), IdeaPolicy)
+    bike, helmet, _ = await service.create_many(user, [
+        IdeaCreate(title="Red bicycle", description="bicycle for the city", is_global=False),
+        IdeaCreate(title="Helmet", description="to wear on a bicycle", is_global=False),
+        IdeaCreate(title="Cookbook", description="Italian recipes", is_global=False),
+    ])
+
+    assert [idea.id for idea in await service.search(user, "bicycle")] == [bike.id, helmet.id]
+    assert [idea.id for idea in await service.search(user, "bic ITAL")] == []
+    assert [idea.title for idea in await service.search(user, "ital")] == ["Cookbook"]
+    assert await service.search(user, "bicycle", scope="global") == []
+
+    await service.update_many(user, [IdeaBulkUpdate(id=helmet.id, description="to wear on a scooter")])
+    await service.soft_delete_many(user, [bike.id])
+    assert await service.search(user, "bicycle") == []
+
+
+def test_search_query_repeats_the_indexed_expression():
+    dialect = postgresql.dialect()
+    [index] = [i for i in GiftIdea.__table__.indexes if i.name == "ix_gift_ideas_search"]
+    indexed = str(CreateIndex(index).compile(dialect=dialect)).split("USING gin (", 1)[1][:-1]
+    query = str(idea_search.apply(select(GiftIdea.id), "postgresql", "bike").compile(dialect=dialect))
+
+    assert indexed.replace("coalesce(", "coalesce(gift_ideas.") in query
+
+
+def test_searchable_repository_requires_a_search_index():
+    with pytest.raises(TypeError):
+        class UnindexedRepository(SearchableRepositoryMixin, SQLAlchemyRepository[GiftIdea]):
+            pass
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+from jinja2 import Environment, ModuleLoader
+from sqlalchemy import select
+
+from app.core.enums import MailStatus
+from app.core.settings import jinja_env, compile_mail_templates
+from app.core.config import get_settings
+from app.mail import (
+    OutboxMailSender, FileMailSender, MailSender, SendgridMailSender, BulkSendError, drain_outbox, render_email,
+    render_email_batch,
+)
+from app.models import OutboxMail
+
+
+class FailingMailSender(MailSender):
+    def __init__(self, fail_on: str = None):
+        self.fail_on = fail_on
+        self.sent = []
+
+    async def send_mail(self, to: str, subject: str, html_content: str) -> None:
+        if self.fail_on is None or to == self.fail_on:
+            raise ConnectionError("mail provider is down")
+        self.sent.append(to)
+
+
+async def outbox_rows(db_session) -> list[OutboxMail]:
+    return list((await db_session.execute(select(OutboxMail).order_by(OutboxMail.to_email))).scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_outbox_is_drained_in_bulk_to_transport(db_session, tmp_path):
+    outbox = OutboxMailSender(db_session)
+    await outbox.send_bulk(["a@example.com", "b@example.com"], "Reminder", "<p>Soon</p>")
+    await outbox.send_mail("c@example.com", "Activate", "<p>Link</p>")
+
+    path = tmp_path / "mail.jsonl"
+    sent = await drain_outbox(db_session, FileMailSender(str(path)), batch_size=2)
+
+    assert sent == 3
+    delivered = [json.loads(line) for line in path.read_text().splitlines()]
+    assert sorted(m["to"] for m in delivered) == ["a@example.com", "b@example.com", "c@example.com"]
+    assert all(row.status == MailStatus.SENT.value for row in await outbox_rows(db_session))
+
+
+@pytest.mark.asyncio
+async def test_failed_delivery_backs_off_and_dead_letters(db_session):
+    await OutboxMailSender(db_session).send_mail("a@example.com", "Activate", "<p>Link</p>")
+
+    assert await drain_outbox(db_session, FailingMailSender(), max_attempts=2) == 0
+    [row] = await outbox_rows(db_session)
+    assert row.status == MailStatus.PENDING.value
+    assert row.attempts == 1 and "mail provider is down" in row.last_error
+
+    # not due yet, so the next run leaves it alone
+    assert await drain_outbox(db_session, FailingMailSender(), max_attempts=2) == 0
+    assert row.attempts == 1
+
+    row.next_attempt_at = row.created_at
+    await db_session.commit()
+    await drain_outbox(db_session, FailingMailSender(), max_attempts=2)
+    assert row.status == MailStatus.DEAD.value
+
+
+@pytest.mark.asyncio
+async def test_partially_failed_bulk_send_only_retries_undelivered(db_session):
+    await OutboxMailSender(db_session).send_bulk(["a@example.com", "b@example.com", "c@example.com"], "News", "<p>Hi</p>")
+    transport = FailingMailSender(fail_on="b@example.com")
+
+    assert await drain_outbox(db_session, transport) == 1
+
+    assert transport.sent == ["a@example.com"]
+    rows = await outbox_rows(db_session)
+    assert [(row.status, row.attempts) for row in rows] == [
+        (MailStatus.SENT.value, 0), (MailStatus.PENDING.value, 1), (MailStatus.PENDING.value, 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sendgrid_bulk_send_reports_recipients_of_delivered_chunks(monkeypatch):
+    class Client:
+        def __init__(self):
+            self.calls = 0
+
+        def send(self, message):
+            self.calls += 1
+            if self.calls == 2:
+                raise ConnectionError("mail provider is down")
+
+    monkeypatch.setattr(SendgridMailSender, "MAX_PERSONALIZATIONS", 2)
+    sender = SendgridMailSender()
+    sender._client = Client()
+
+    with pytest.raises(BulkSendError) as e:
+        await sender.send_bulk(["a@example.com", "b@example.com", "c@example.com"], "News", "<p>Hi</p>")
+    assert e.value.delivered == ["a@example.com", "b@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_batch_render_matches_single_render():
+    contexts = [{"username": f"user{i}@example.com", "link": f"example.com/activate?token={i}"} for i in range(3)]
+
+    batch = await render_email_batch("activate_account.html", contexts)
+
+    assert batch == [await render_email("activate_account.html", context) for context in contexts]
+    assert "example.com/activate?token=2" in batch[2]
+    assert get_settings().APP_NAME in batch[0]
+
+
+def test_templates_compiled_ahead_of_time_render_the_same(tmp_path):
+    compile_mail_templates(str(tmp_path))
+    env = Environment(loader=ModuleLoader(str(tmp_path)))
+    env.globals.update(jinja_env.globals)
+    context = {"username": "user@example.com", "link": "example.com/activate?token=1"}
+
+    compiled = env.get_template("activate_account.html").render(**context)
+
+    assert compiled == jinja_env.get_template("activate_account.html").render(**context)
@@ -0,0 +1,367 @@
+import time
+import asyncio
+import hashlib
+import threading
+from io import BytesIO
+
+import pytest
+from fastapi import UploadFile, HTTPException
+from PIL import Image
+from starlette.datastructures import Headers
+from botocore.stub import Stubber, ANY
+from sqlalchemy import select, func
+
+from app.api.v1.features.media.dependencies import extract_image_data, MAX_FILE_SIZE
+from app.core.config import get_settings
+from app.core.enums import MediaType
+from app.exceptions.common import ServiceBusy
+from app.exceptions.media import MediaValidateFailure
+from app.models import MediaFile
+from app.repositories.orm.media import MediaRepository
+from app.schemas.media import MediaFileMeta
+from app.service.media import MediaUploaderService, MediaVariantService, ContentMediaValidator, KnownMediaHashes
+from app.storage import MediaStorage, LocalFSMediaStorage, S3MediaStorage
+from app.service.media.variants import variant_path, render_variants
+from app.utils.bloom import BloomFilter
+from app.utils.cache import TTLCache
+from app.utils.concurrency import BoundedExecutor
+
+
+class MemoryMediaStorage(MediaStorage):
+    def __init__(self, fail_on: str = None, delay: float = 0.02):
+        self.objects = {}
+        self.fail_on = fail_on
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def upload(self, file: bytes, path: str, content_type: str) -> str:
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(self.delay)
+            data = file if isinstance(file, bytes) else file.read()
+            if self.fail_on and data == self.fail_on.encode():
+                raise RuntimeError("Error uploading file")
+            self.objects[path] = data
+            return f"https://media.example.com/{path}"
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def read(self, path: str) -> bytes:
+        return self.objects[path]
+
+    def delete(self, path: str):
+        self.objects.pop(path, None)
+
+    def exists(self, path: str) -> bool:
+        return path in self.objects
+
+    def exists_many(self, prefix: str):
+        return {path for path in self.objects if path.startswith(prefix)}
+
+    def path_from_url(self, url: str):
+        return url.removeprefix("https://media.example.com/")
+
+
+def meta(content: str) -> MediaFileMeta:
+    return MediaFileMeta(
+        filename=f"{content}.png",
+        mime_type="image/png",
+        size_bytes=len(content),
+        width=10,
+        height=10,
+        ratio=1.0,
+        hash=content.encode().hex().ljust(64, "0"),
+    )
+
+
+@pytest.mark.asyncio
+async def test_upload_many_runs_in_parallel_and_deduplicates(db_session):
+    storage = MemoryMediaStorage()
+    uploader = MediaUploaderService(MediaRepository(db_session), storage, ContentMediaValidator(), max_parallel=3)
+    [first] = await uploader.upload_many([BytesIO(b"a")], [meta("a")], MediaType.CONTENT)
+
+    contents = ["a", "b", "c", "d", "e", "b"]
+    result = await uploader.upload_many([BytesIO(c.encode()) for c in contents], [meta(c) for c in contents], MediaType.CONTENT)
+
+    assert [m.hash for m in result] == [meta(c).hash for c in contents]
+    assert result[0].id == first.id
+    assert result[1].id == result[5].id
+    assert len(storage.objects) == 5
+    assert storage.peak == 3
+    assert await db_session.scalar(select(func.count()).select_from(MediaFile)) == 5
+
+
+@pytest.mark.asyncio
+async def test_upload_many_removes_stored_objects_when_one_upload_fails(db_session):
+    storage = MemoryMediaStorage(fail_on="c")
+    uploader = MediaUploaderService(MediaRepository(db_session), storage, ContentMediaValidator(), max_parallel=2)
+
+    contents = ["a", "b", "c", "d"]
+    with pytest.raises(RuntimeError):
+        await uploader.upload_many([BytesIO(c.encode()) for c in contents], [meta(c) for c in contents], MediaType.CONTENT)
+
+    assert storage.objects == {}
+    assert await db_session.scalar(select(func.count()).select_from(MediaFile)) == 0
+
+
+@pytest.mark.asyncio
+async def test_upload_many_restores_missing_object_of_deduplicated_file(db_session):
+    storage = MemoryMediaStorage()
+    uploader = MediaUploaderService(MediaRepository(db_session), storage, ContentMediaValidator())
+    stored = await uploader.upload_one(BytesIO(b"a"), meta("a"), MediaType.CONTENT)
+    storage.objects.clear()
+
+    [result] = await uploader.upload_many([BytesIO(b"a")], [meta("a")], MediaType.CONTENT)
+
+    assert result.id == stored.id
+    assert storage.objects == {storage.path_from_url(str(stored.url)): b"a"}
+    assert await db_session.scalar(select(func.count()).select_from(MediaFile)) == 1
+
+
+@pytest.mark.asyncio
+async def test_known_hashes_skip_lookup_and_fall_back_on_conflict(db_session):
+    known_hashes = KnownMediaHashes(capacity=100)
+    await known_hashes.warm(MediaRepository(db_session))
+    storage = MemoryMediaStorage()
+    uploader = MediaUploaderService(
+        MediaRepository(db_session), storage, ContentMediaValidator(), known_hashes=known_hashes
+    )
+    known = await uploader.upload_one(BytesIO(b"c"), meta("c"), MediaType.CONTENT)
+    # stored by another worker after the filter was warmed
+    other = MediaUploaderService(
+        MediaRepository(db_session), storage, ContentMediaValidator(), known_hashes=KnownMediaHashes(capacity=100)
+    )
+    stored = await other.upload_one(BytesIO(b"a"), meta("a"), MediaType.CONTENT)
+    await db_session.commit()
+    assert not known_hashes.might_exist(stored.hash)
+    # staged earlier in the same unit of work
+    await other.upload_one(BytesIO(b"s"), meta("s"), MediaType.CONTENT)
+
+    result = await uploader.upload_many(
+        [BytesIO(b"a"), BytesIO(b"b"), BytesIO(b"c")], [meta("a"), meta("b"), meta("c")], MediaType.CONTENT
+    )
+
+    assert result[0].id == stored.id and result[2].id == known.id
+    assert known_hashes.might_exist(meta("a").hash) and known_hashes.might_exist(meta("b").hash)
+    assert len(storage.objects) == 4
+    await db_session.commit()
+    assert await db_session.scalar(select(func.count()).select_from(MediaFile)) == 4
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"hash-{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    assert sum(f"other-{i}" in bloom for i in range(1000)) < 50
+
+
+def upload_file(content: bytes, content_type: str = "image/png", size: int = None) -> UploadFile:
+    return UploadFile(
+        BytesIO(content), size=size, filename="image.png", headers=Headers({"content-type": content_type})
+    )
+
+
+def png_bytes(width: int, height: int) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_extract_image_data_hashes_in_chunks_and_rewinds():
+    content = png_bytes(30, 20)
+
+    data, file_object = await extract_image_data(upload_file(content))
+
+    assert (data.width, data.height, data.size_bytes) == (30, 20, len(content))
+    assert data.hash == hashlib.sha256(content).hexdigest()
+    assert file_object.read() == content
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("content", [b"not an image", png_bytes(10, 10)[:60]])
+async def test_extract_image_data_rejects_broken_images(content):
+    with pytest.raises(MediaValidateFailure) as e:
+        await extract_image_data(upload_file(content))
+    assert e.value.message == "Invalid image file"
+
+
+@pytest.mark.asyncio
+async def test_extract_image_data_rejects_large_files_while_reading():
+    with pytest.raises(MediaValidateFailure) as e:
+        await extract_image_data(upload_file(b"\0" * (MAX_FILE_SIZE + 1), size=None))
+    assert e.value.message == "File too large"
+
+
+@pytest.mark.asyncio
+async def test_extract_image_data_rejects_declared_size_up_front():
+    with pytest.raises(HTTPException) as e:
+        await extract_image_data(upload_file(b"", size=MAX_FILE_SIZE + 1))
+    assert e.value.detail == "File too large"
+
+
+@pytest.mark.asyncio
+async def test_saturated_executor_rejects_instead_of_queueing():
+    executor = BoundedExecutor(max_workers=1, name="Media processing", max_queued=1)
+
+    results = await asyncio.gather(*(executor.run(time.sleep, 0.05) for _ in range(3)), return_exceptions=True)
+
+    assert [isinstance(r, ServiceBusy) for r in results] == [False, False, True]
+    assert results[2].status_code == 503
+    assert executor.stats()["rejected"] == 1
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_variants_are_generated_for_new_uploads_and_returned_on_dedup(db_session):
+    storage = MemoryMediaStorage(delay=0)
+    created = []
+    uploader = MediaUploaderService(
+        MediaRepository(db_session), storage, ContentMediaValidator(),
+        on_created=lambda media, path: created.append((media.id, path)),
+    )
+    content = png_bytes(300, 200)
+    data, file_object = await extract_image_data(upload_file(content))
+
+    [media] = await uploader.upload_many([file_object], [data], MediaType.CONTENT)
+    assert media.variants == [] and created == [(media.id, created[0][1])]
+
+    variant_service = MediaVariantService(MediaRepository(db_session), storage, widths=[64, 256, 1024], formats=["webp"])
+    variants = await variant_service.generate(*created[0])
+    assert [(v.width, v.height, v.format) for v in variants] == [(64, 43, "webp"), (256, 171, "webp")]
+    assert all(v.url.endswith(f"/{v.width}w.webp") for v in variants)
+
+    db_session.expunge_all()
+    [again] = await uploader.upload_many([BytesIO(content)], [data], MediaType.CONTENT)
+    assert again.id == media.id and len(created) == 1
+    assert [v.width for v in again.variants] == [64, 256]
+
+
+def test_variants_apply_exif_orientation_before_sizing():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # stored landscape, displayed rotated by 90 degrees
+    buffer = BytesIO()
+    Image.new("RGB", (300, 200), "red").save(buffer, format="JPEG", exif=exif)
+
+    [variant] = render_variants(buffer.getvalue(), widths=[100, 250], formats=["webp"])
+
+    assert (variant.width, variant.height) == (100, 150)
+    assert Image.open(BytesIO(variant.content)).size == (100, 150)
+
+
+def test_local_storage_writes_atomically_and_maps_reads(tmp_path):
+    storage = LocalFSMediaStorage(root=str(tmp_path), base_url="http://localhost/media/")
+
+    url = storage.upload(BytesIO(b"content"), "content/abc.png", "image/png")
+
+    assert url == "http://localhost/media/content/abc.png"
+    assert storage.exists("content/abc.png")
+    assert bytes(storage.read("content/abc.png")) == b"content"
+    assert [p.name for p in (tmp_path / "content").iterdir()] == ["abc.png"]
+
+    storage.delete("content/abc.png")
+    assert not storage.exists("content/abc.png")
+    with pytest.raises(ValueError):
+        storage.upload(b"x", "../outside.png", "image/png")
+
+
+@pytest.mark.asyncio
+async def test_variants_render_from_memory_mapped_local_file(db_session, tmp_path):
+    storage = LocalFSMediaStorage(root=str(tmp_path), base_url="http://localhost/media")
+    uploader = MediaUploaderService(MediaRepository(db_session), storage, ContentMediaValidator())
+    data, file_object = await extract_image_data(upload_file(png_bytes(300, 200)))
+    [media] = await uploader.upload_many([file_object], [data], MediaType.CONTENT)
+
+    path = media.url.path.removeprefix("/media/")
+    sources = []
+    read = storage.read
+    storage.read = lambda p: sources.append(read(p)) or sources[-1]
+    service = MediaVariantService(MediaRepository(db_session), storage, widths=[100])
+    variants = await service.generate(media.id, path)
+
+    assert [(v.width, v.height) for v in variants] == [(100, 67)]
+    assert storage.exists(variant_path(path, 100, "webp"))
+    assert all(source.closed for source in sources)
+
+    # widths recorded by an earlier run are skipped instead of violating the unique constraint
+    service.widths = [50, 100]
+    assert [v.width for v in await service.generate(media.id, path)] == [50]
+    assert await service.generate(media.id, path) == []
+
+
+def test_s3_storage_uses_put_object_below_multipart_threshold(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "AWS_BUCKET_NAME", "media")
+    monkeypatch.setattr(settings, "AWS_REGION", "eu-central-1")
+    storage = S3MediaStorage()
+
+    with Stubber(storage.s3_client) as stub:
+        stub.add_response("put_object", {}, {
+            "Bucket": "media", "Key": "content/a.png", "Body": ANY, "ContentType": "image/png",
+        })
+        storage.upload(BytesIO(b"small"), "content/a.png", "image/png")
+
+        large = BytesIO(b"\0" * (settings.AWS_S3_MULTIPART_THRESHOLD + 1))
+        stub.add_response("create_multipart_upload", {"UploadId": "upload"})
+        stub.add_response("upload_part", {"ETag": "part"})
+        stub.add_response("upload_part", {"ETag": "part"})
+        stub.add_response("complete_multipart_upload", {})
+        storage.upload(large, "content/b.png", "image/png")
+        stub.assert_no_pending_responses()
+
+
+def test_s3_exists_caches_head_results(monkeypatch):
+    monkeypatch.setattr(get_settings(), "AWS_BUCKET_NAME", "media")
+    storage = S3MediaStorage()
+    storage.exists_cache = TTLCache(100, 60)
+
+    with Stubber(storage.s3_client) as stub:
+        stub.add_response("head_object", {}, {"Bucket": "media", "Key": "content/a.png"})
+        stub.add_client_error("head_object", "404", http_status_code=404)
+        assert storage.exists("content/a.png")
+        assert storage.exists("content/a.png")
+        assert not storage.exists("content/z.png")
+        stub.assert_no_pending_responses()
+
+    assert storage.exists_cache.get("content/z.png") is False
+
+
+def test_s3_exists_many_lists_the_whole_prefix_page_by_page(monkeypatch):
+    monkeypatch.setattr(get_settings(), "AWS_BUCKET_NAME", "media")
+    storage = S3MediaStorage()
+    storage.exists_cache = TTLCache(100, 60)
+
+    with Stubber(storage.s3_client) as stub:
+        stub.add_response(
+            "list_objects_v2",
+            {"Contents": [{"Key": "content/a.png"}, {"Key": "content/b.png"}], "IsTruncated": True,
+             "NextContinuationToken": "next"},
+            {"Bucket": "media", "Prefix": "content/"},
+        )
+        stub.add_response(
+            "list_objects_v2",
+            {"Contents": [{"Key": "content/c.png"}], "IsTruncated": False},
+            {"Bucket": "media", "Prefix": "content/", "ContinuationToken": "next"},
+        )
+        assert storage.exists_many("content/") == {"content/a.png", "content/b.png", "content/c.png"}
+        stub.assert_no_pending_responses()
+
+    assert storage.exists_cache.get("content/a.png") is None
+
+
+def test_local_storage_exists_many_lists_files_under_prefix(tmp_path):
+    storage = LocalFSMediaStorage(root=str(tmp_path), base_url="/media")
+    storage.upload(b"a", "content/a.png", "image/png")
+    storage.upload(b"b", "content/variants/b.webp", "image/webp")
+    storage.upload(b"c", "avatar/c.png", "image/png")
+    (tmp_path / "content" / ".upload-partial").write_bytes(b"")
+
+    assert storage.exists_many("content/") == {"content/a.png", "content/variants/b.webp"}
@@ -0,0 +1,127 @@
+from decimal import Decimal
+from datetime import date
+
+import pytest
+
+from app.models import GiftIdea, Recipient, SimpleUser
+from app.repositories.orm import IdeaRepository, RecipientRepository
+from app.exceptions.common import InvalidCursor
+
+
+async def walk_pages(repo, limit, order_by, desc_order, **filters):
+    seen, cursor = [], None
+    while True:
+        page = await repo.list(limit=limit, order_by=order_by, desc_order=desc_order, cursor=cursor, **filters)
+        seen.extend(page)
+        # a cursor that does not advance would page forever
+        if len(page) < limit or len(seen) > 100:
+            return seen
+        cursor = repo.make_cursor(page[-1], order_by, desc_order)
+
+
+@pytest.fixture(scope="function")
+async def owner(db_session) -> SimpleUser:
+    owner = SimpleUser(email="pages@example.com", username="pages", hashed_password="x")
+    db_session.add(owner)
+    await db_session.commit()
+    return owner
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("order_by", [None, "name", "birthday", "relation"])
+@pytest.mark.parametrize("desc_order", [False, True])
+async def test_cursor_pages_match_full_listing(db_session, owner, order_by, desc_order):
+    db_session.add_all([
+        Recipient(
+            name=f"r{i % 4}",
+            birthday=date(1990 + i % 3, 1, 1),
+            relation=None if i % 2 else "friend",
+            user_id=owner.id,
+        )
+        for i in range(11)
+    ])
+    await db_session.commit()
+    repo = RecipientRepository(db_session)
+
+    expected = await repo.list(limit=0, order_by=order_by, desc_order=desc_order)
+    walked = await walk_pages(repo, 3, order_by, desc_order)
+
+    assert [r.id for r in walked] == [r.id for r in expected]
+    assert len(walked) == 11
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_with_filters_and_nullable_decimal(db_session, owner):
+    db_session.add_all([
+        GiftIdea(
+            title=f"idea {i}",
+            is_global=False,
+            estimated_price=None if i % 3 == 0 else Decimal(i % 4),
+            user_id=owner.id,
+        )
+        for i in range(10)
+    ])
+    await db_session.commit()
+    repo = IdeaRepository(db_session)
+
+    expected = await repo.list(limit=0, order_by="estimated_price", desc_order=True, user_id=owner.id)
+    walked = await walk_pages(repo, 4, "estimated_price", True, user_id=owner.id)
+
+    assert [i.id for i in walked] == [i.id for i in expected]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("order_by", ["created_at", "updated_at"])
+@pytest.mark.parametrize("desc_order", [False, True])
+async def test_cursor_pages_by_server_set_timestamps(db_session, owner, order_by, desc_order):
+    ideas = [GiftIdea(title=f"idea {i}", is_global=False, user_id=owner.id) for i in range(7)]
+    db_session.add_all(ideas)
+    await db_session.commit()
+    repo = IdeaRepository(db_session)
+    for idea in ideas[::2]:
+        await repo.update(idea, {"title": idea.title + "!"})
+    await db_session.commit()
+
+    expected = await repo.list(limit=0, order_by=order_by, desc_order=desc_order)
+    walked = await walk_pages(repo, 2, order_by, desc_order)
+
+    assert [i.id for i in walked] == [i.id for i in expected]
+    assert len(walked) == 7
+
+
+@pytest.mark.asyncio
+async def test_cursor_for_other_sorting_is_rejected(db_session, owner):
+    db_session.add(Recipient(name="only", user_id=owner.id))
+    await db_session.commit()
+    repo = RecipientRepository(db_session)
+    recipient = (await repo.list())[0]
+
+    with pytest.raises(InvalidCursor):
+        await repo.list(order_by="birthday", cursor=repo.make_cursor(recipient, "name"))
+    with pytest.raises(InvalidCursor):
+        await repo.list(cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count_mode", ["exact", "estimated"])
+async def test_list_page_total_respects_filters(db_session, owner, count_mode):
+    db_session.add_all([
+        Recipient(name=f"r{i}", relation="friend" if i % 2 else None, user_id=owner.id)
+        for i in range(7)
+    ])
+    await db_session.commit()
+    repo = RecipientRepository(db_session)
+
+    first, total = await repo.list_page(limit=2, count_mode=count_mode, relation="friend")
+    assert len(first) == 2 and total == 3
+
+    _, total = await repo.list_page(
+        limit=2, cursor=repo.make_cursor(first[-1]), count_mode=count_mode, relation="friend"
+    )
+    assert total == 3
+
+    past_end, total = await repo.list_page(skip=10, limit=2, count_mode=count_mode, relation="friend")
+    assert past_end == [] and total == 3
+
+    _, total = await repo.list_page(limit=2)
+    assert total is None
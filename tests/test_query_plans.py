@@ -0,0 +1,81 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from app.models import Event, SimpleUser
+from app.repositories.orm import IdeaRepository, MediaRepository, UserRepository, RecipientRepository
+from app.service.event import (
+    get_event, get_event_list, get_next_occurrence, iter_occurrences_in_range, generate_missing_occurrences,
+)
+
+
+NON_TABLE_SCANS = ("SCAN CONSTANT ROW", "SCAN (subquery", "SCAN SUBQUERY")
+# an FTS5 table answering a MATCH reads its index, not every row
+FTS_MATCH = "VIRTUAL TABLE INDEX 0:M"
+
+
+@pytest.fixture(scope="function")
+async def captured_selects(db_session):
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    sync_engine = db_session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _capture)
+    yield statements
+    event.remove(sync_engine, "before_cursor_execute", _capture)
+
+
+@pytest.fixture(scope="function")
+async def user(db_session) -> SimpleUser:
+    user = SimpleUser(email="plans@example.com", username="plans", hashed_password="x", is_active=True)
+    db_session.add(user)
+    await db_session.commit()
+    return user
+
+
+async def assert_no_full_scan(db_session, statements):
+    assert statements, "no queries were captured"
+    conn = await db_session.connection()
+    for statement, parameters in statements:
+        result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        details = [row[-1] for row in result]
+        scans = [
+            d for d in details
+            if d.startswith("SCAN ") and not d.startswith(NON_TABLE_SCANS) and FTS_MATCH not in d
+        ]
+        assert not scans, f"full scan {scans} in:\n{statement}"
+
+
+@pytest.mark.asyncio
+async def test_repository_queries_use_indexes(db_session, user, captured_selects):
+    await IdeaRepository(db_session).get_by_user_id(user.id, is_archived=False)
+    await IdeaRepository(db_session).list(is_global=True, is_archived=False)
+    await RecipientRepository(db_session).get_by_user_id(user.id)
+    await IdeaRepository(db_session).search("red bike", is_global=True, is_archived=False)
+    await RecipientRepository(db_session).search("sister", user_id=user.id)
+    await MediaRepository(db_session).get_by_hash("0" * 64)
+    await MediaRepository(db_session).get_by_hashes(["0" * 64, "1" * 64])
+    await UserRepository(db_session).get_by_email(user.email)
+    await UserRepository(db_session).get_by_id(user.id)
+
+    await assert_no_full_scan(db_session, captured_selects)
+
+
+@pytest.mark.asyncio
+async def test_event_queries_use_indexes(db_session, user, captured_selects):
+    event_obj = Event(title="Plans", is_global=False, is_repeating=True, start_date=date(2020, 1, 1), user_id=user.id)
+    db_session.add(event_obj)
+    await db_session.commit()
+    captured_selects.clear()
+
+    await get_event(event_obj.id, user, db_session)
+    await get_event_list(user, db_session)
+    await get_next_occurrence(event_obj, db_session)
+    [occur async for occur in iter_occurrences_in_range(user, db_session, date(2024, 1, 1), date(2024, 12, 31))]
+    await generate_missing_occurrences(db_session, catch_up=True)
+
+    await assert_no_full_scan(db_session, captured_selects)
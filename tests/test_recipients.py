@@ -1,5 +1,13 @@
+from datetime import date
+
 import pytest
 
+from app.models import SimpleUser
+from app.repositories.orm import RecipientRepository
+from app.schemas.recipient import RecipientCreate
+from app.schemas.user import UserModel
+from app.service.recipient import RecipientService, RecipientPolicy
+
 
 @pytest.mark.asyncio
 async def test_create_recipient(async_client, simple_user_token_headers):
@@ -21,4 +29,18 @@ async def test_create_recipient(async_client, simple_user_token_headers):
     assert data["name"] == recipient_data["name"]
     assert data["preferences"] == recipient_data["preferences"]
     assert data["relation"] == recipient_data["relation"]
-    assert data["notes"] == recipient_data["notes"]
\ No newline at end of file
+    assert data["notes"] == recipient_data["notes"]
+
+@pytest.mark.asyncio
+async def test_create_many_recipients(db_session):
+    user = SimpleUser(email="many@example.com", username="many", hashed_password="x", is_active=True)
+    db_session.add(user)
+    await db_session.commit()
+    service = RecipientService(RecipientRepository(db_session), RecipientPolicy)
+
+    created = await service.create_many(UserModel.model_validate(user), [
+        RecipientCreate(name=f"Friend {i}", birthday=date(2000, 1, i + 1), relation="Friend") for i in range(3)
+    ])
+
+    assert [recipient.name for recipient in created] == ["Friend 0", "Friend 1", "Friend 2"]
+    assert await RecipientRepository(db_session).count(user_id=user.id) == 3
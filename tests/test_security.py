@@ -1,9 +1,20 @@
+import time
+import asyncio
+from uuid import uuid4
 from datetime import timedelta
 
+from jose import jwt
 from jose.exceptions import JWTError, ExpiredSignatureError
 import pytest
 
-from app.utils.security import hash_password, verify_password, create_jwt_token, decode_token
+from app.core.config import get_settings
+from app.utils.concurrency import BoundedExecutor
+from app.utils.security import (
+    hash_password, verify_password, create_jwt_token, decode_token, VerifiedTokenCache,
+    hash_password_async, verify_password_async,
+)
+
+settings = get_settings()
 
 
 def test_password_hashing_and_verification():
@@ -45,4 +56,64 @@ def test_expired_jwt_token_error():
     expired_token = create_jwt_token(payload, timedelta(seconds=-1))
 
     with pytest.raises(ExpiredSignatureError):
-        decode_token(expired_token)
\ No newline at end of file
+        decode_token(expired_token)
+
+def test_verified_token_cache_returns_copies_and_honours_revocation():
+    user_id = uuid4()
+    cache = VerifiedTokenCache(maxsize=10, ttl=60)
+    token = create_jwt_token({"id": user_id.hex, "type": "access"}, timedelta(minutes=15))
+
+    first = cache.decode(token)
+    first["id"] = "mutated"
+    assert cache.decode(token)["id"] == user_id.hex
+
+    # issued in an earlier second
+    stale = jwt.encode(
+        {"id": user_id.hex, "type": "access", "iat": int(time.time()) - 1, "exp": int(time.time()) + 60},
+        settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM,
+    )
+    cache.revoke_user(user_id)
+    with pytest.raises(JWTError):
+        cache.decode(stale)
+    # issued in the second of the revocation, e.g. by logging in again
+    fresh = create_jwt_token({"id": user_id.hex, "type": "access"}, timedelta(minutes=15))
+    assert cache.decode(fresh)["id"] == user_id.hex
+
+
+def test_revocations_are_kept_when_full_and_the_cache_stops_being_trusted():
+    cache = VerifiedTokenCache(maxsize=1, ttl=60, max_revocations=2)
+    users = [uuid4() for _ in range(3)]
+    stale = {
+        user_id: jwt.encode(
+            {"id": user_id.hex, "type": "access", "iat": int(time.time()) - 1, "exp": int(time.time()) + 60},
+            settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM,
+        )
+        for user_id in users
+    }
+
+    for user_id in users:
+        cache.revoke_user(user_id)
+
+    assert not cache.trusted
+    # neither the payload cache's size nor the overflow evicts stored revocations
+    for user_id in users[:2]:
+        with pytest.raises(JWTError):
+            cache.decode(stale[user_id])
+    assert cache.decode(stale[users[2]])["id"] == users[2].hex
+
+
+@pytest.mark.asyncio
+async def test_async_password_helpers_run_in_bounded_pool():
+    executor = BoundedExecutor(max_workers=1, name="test-bcrypt")
+    hashed = await hash_password_async("my-secret")
+
+    results = await asyncio.gather(*(
+        executor.run(verify_password, password, hashed) for password in ["my-secret", "wrong", "my-secret"]
+    ))
+
+    assert results == [True, False, True]
+    assert await verify_password_async("my-secret", hashed) is True
+    stats = executor.stats()
+    assert stats["peak_queued"] == 2
+    assert stats["in_flight"] == 0 and stats["completed"] == 3
+    executor.shutdown()